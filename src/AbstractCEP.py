@@ -1,38 +1,361 @@
 from abc import ABC, abstractmethod
 import json
+import numpy as np
 import pandas as pd
+import spc_constants
 
 class AbstractControlChart(ABC):
-    def __init__(self, data_url, constants_url):
+    def __init__(self, data_url, constants_url, streaming=False):
          # List, array, or DataFrame
         self.sample_size = 0
         self.num_samples = 0
         self.LC = None
         self.LSC = None
         self.LIC = None
-        self.data = self.json_to_data(data_url)
-        self.constants_table = self.json_to_data(constants_url)
+        self.data = self.load_data(data_url, streaming)
+        # Tabela do JSON completada por constantes calculadas para qualquer n (ver spc_constants)
+        self.constants_table = spc_constants.ConstantsProvider(self.json_to_data(constants_url))
 
 
 
+    @staticmethod
+    def load_data(url, streaming=False):
+        import cep_dataset
+        # Diretórios .cep (ver cep_dataset) são abertos via mmap, sem cópia
+        if cep_dataset.is_dataset(url):
+            return cep_dataset.load_dataset(url)
+        # streaming=True lê o arquivo em blocos direto para arrays (ver json_to_columns)
+        if streaming:
+            return AbstractControlChart.json_to_columns(url)
+        return AbstractControlChart.json_to_data(url)
+
     @staticmethod
     def json_to_data(url):
         try:
-            
-            with open(url, 'r') as f:
+
+            with open(url, 'r', encoding='utf-8') as f:
                 json_data = json.load(f)
-            
-           
-            if isinstance(json_data, list):
-                return pd.DataFrame(json_data)
-            # Se for um dicionário (como constantes_cep.json), retorna como está
-            elif isinstance(json_data, dict):
-                return json_data
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Erro ao ler {url}: {e}") from e
+
+        if isinstance(json_data, list):
+            return pd.DataFrame(json_data)
+        # Se for um dicionário (como constantes_cep.json), retorna como está
+        elif isinstance(json_data, dict):
+            return json_data
+        else:
+            raise ValueError(f"Formato JSON não suportado em {url}: esperado lista de registros ou dicionário")
+
+    @staticmethod
+    def json_to_columns(url, chunk_size=10000):
+        # Registros chegam em blocos e são copiados para arrays pré-alocados;
+        # campos com listas (ex.: "Dados") viram matrizes 2-D
+        columns = {}
+        count = 0
+        for chunk in iter_json_records(url, chunk_size):
+            if not columns:
+                columns = {key: _allocate_column(value, chunk_size) for key, value in chunk[0].items()}
+            end = count + len(chunk)
+            for key in columns:
+                column = columns[key]
+                try:
+                    values = [record[key] for record in chunk]
+                    values = _subgroup_matrix(values) if column.ndim == 2 else np.asarray(values)
+                    if values.ndim != column.ndim:
+                        raise ValueError("dimensões diferentes")
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"Erro ao ler {url}: campo '{key}' ausente ou irregular entre os registros {count + 1} e {end}") from e
+                if column.ndim == 2:
+                    # Subgrupos de tamanhos diferentes são completados com NaN, como na leitura sem streaming
+                    width = max(column.shape[1], values.shape[1])
+                    column, values = _pad(column, width), _pad(values, width)
+                if column.dtype.kind == 'i' and values.dtype.kind == 'f':
+                    column = column.astype(np.float64)
+                column = _reserve(column, count, len(chunk))
+                try:
+                    column[count:end] = values
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Erro ao ler {url}: campo '{key}' com valor inválido entre os registros {count + 1} e {end}: {e}") from e
+                columns[key] = column
+            count = end
+        if not count:
+            raise ValueError(f"Erro ao ler {url}: nenhum registro encontrado")
+        return {key: column[:count] for key, column in columns.items()}
+
+
+class AbstractVariablesChart(AbstractControlChart):
+    # Base dos gráficos de variáveis (X̄-R, X̄-S, X, I-MR): opções de saída, análise, relatório
+    # e limites de especificação. As subclasses calculam sigma e limites (normalize_data) e
+    # desenham a figura (_build_figure / _update_figure / chart_spec).
+    chart_type: str  # chave do template (chart_rendering), da análise (analysis_result) e do relatório
+    analyzer_names: tuple = ("analyzer_x",)
+    lse: float = None
+    lie: float = None
+    analysis: "analysis_result.ChartAnalysisResult" = None
+    capability_intervals: "capability_intervals.IntervalOptions" = None
+
+    def __init__(self, data_url, constants_url, streaming=False, compute_only=False, output_png=None, output_html=None, render_profile=None, chart_format="png", table_mode="full"):
+        # compute_only=True calcula limites e análises sem gerar PNG/HTML (ver generate_report)
+        self.compute_only = compute_only
+        self.output_png = output_png
+        self.output_html = output_html
+        # None usa o perfil global de chart_rendering (ver use_profile / FAST_RENDER)
+        self.render_profile = render_profile
+        self.chart_png = None
+        # "svg" embute séries e limites como JSON no relatório (ver svg_chart) em vez do PNG
+        self.chart_format = chart_format
+        self.table_mode = table_mode  # "full" ou "paged" (tabela paginada no navegador)
+        super().__init__(data_url, constants_url, streaming=streaming)
+        self.normalize_data()
+
+    def plot_control_charts(self):
+        import chart_rendering
+        profile = chart_rendering.resolve_profile(self.render_profile)
+        template = chart_rendering.get_template(self.chart_type, self._build_figure, profile)
+        self._update_figure(template)
+        # PNG fica em memória (chart_png) para o relatório; output_png=None dispensa o arquivo
+        self.chart_png = chart_rendering.render_png(template, profile, self.output_png)
+        if self.output_png:
+            print(f"Gráfico salvo como '{self.output_png}'")
+
+    def get_analysis(self):
+        import analysis_result
+        # Calculada uma vez e reaproveitada até os dados ou limites mudarem
+        if self.analysis is None:
+            self.analysis = analysis_result.ANALYZERS[self.chart_type](self)
+        return self.analysis
+
+    def analyze_control_status(self):
+        import report_bridge
+        analysis = self.get_analysis()
+        for line in analysis.summary_lines():
+            print(line)
+        # ProcessCapability só com limites de especificação definidos; o resumo imutável fica em analysis.capability
+        if analysis.process_capability is not None:
+            self.capability = analysis.process_capability
+        for name, analyzer in zip(self.analyzer_names, analysis.analyzers):
+            setattr(self, name, analyzer)
+        if not self.compute_only:
+            report_bridge.generate_report_from_instance(self, chart_type=self.chart_type)
+
+    def generate_report(self):
+        import report_bridge
+        if self.chart_format == "png":
+            self.plot_control_charts()
+        return report_bridge.generate_report_from_instance(self, chart_type=self.chart_type)
+
+    def set_specification_limits(self, lse: float, lie: float):
+        self.lse = lse
+        self.lie = lie
+        self.analysis = None
+        print(f"[INFO] Limites de especificação definidos:")
+        print(f"   LSE (Limite Superior): {self.lse:.4f}")
+        print(f"   LIE (Limite Inferior): {self.lie:.4f}")
+
+    def set_capability_intervals(self, method="analytic", confidence=0.95, **bootstrap):
+        # "analytic" ou "bootstrap" (n_boot, seed, batch_size, max_workers); method=None desliga
+        import capability_intervals
+        self.capability_intervals = None if method is None else capability_intervals.check_options(method, confidence, **bootstrap)
+        self.analysis = None
+        if self.capability_intervals is not None:
+            print(f"[INFO] Intervalos de confiança de RCP/RCPk: {method} ({confidence:.0%})")
+
+
+class AbstractSubgroupChart(AbstractVariablesChart):
+    # Gráficos de subgrupos (X̄-R, X̄-S): medições em uma matriz (subgrupos x n) com NaN nas
+    # leituras ausentes; as subclasses só calculam as estatísticas, sigma e limites.
+    # Subgrupos da carga ficam na matriz lida (sem cópia; .cep continua em mmap) e os incluídos
+    # por extend vão para um buffer que dobra de tamanho, como em IMR_graph, assim como as
+    # estatísticas por subgrupo: cada inclusão custa O(n). subgroups e df são montados só quando lidos.
+
+    def _load_subgroups(self):
+        self._base, self._meta = self._read_subgroups()
+        self._added = np.empty((0, self._base.shape[1]))
+        self._added_ids = []
+        self._columns = {}
+        self._count = 0
+        self._subgroups = self._df = None
+
+    def _read_subgroups(self):
+        # (matriz contígua de medições, DataFrame sem a coluna "Dados")
+        if isinstance(self.data, dict):
+            subgroups = np.ascontiguousarray(self.data["Dados"], dtype=np.float64)
+            frame = pd.DataFrame({key: values for key, values in self.data.items() if key != "Dados"})
+        else:
+            frame = pd.DataFrame(self.data)
+            subgroups = _subgroup_matrix(frame["Dados"])
+            frame = frame.drop(columns=["Dados"])
+        return subgroups, frame
+
+    @property
+    def subgroups(self) -> np.ndarray:
+        # Reaproveitada até o próximo extend (limites de especificação, bootstrap)
+        if self._subgroups is None:
+            if self._added_ids:
+                width = max(self._base.shape[1], self._added.shape[1])
+                self._subgroups = np.vstack([_pad(self._base, width), _pad(self._added[:len(self._added_ids)], width)])
             else:
-                # Fallback para pd.read_json
-                return pd.read_json(url)
-        except Exception as e:
-            print(f"Erro ao ler {url}: {e}")
-            # Fallback para pd.read_json
-            return pd.read_json(url)
-        
+                self._subgroups = self._base
+        return self._subgroups
+
+    @property
+    def df(self) -> pd.DataFrame:
+        # Idem para a tabela (gráfico, análise, relatório)
+        if self._df is None:
+            frame = self._meta.copy()
+            if self._added_ids:
+                frame = pd.concat([frame, pd.DataFrame({"Amostra": self._added_ids})], ignore_index=True)
+            self._df = self._build_frame(frame)
+        return self._df
+
+    def _build_frame(self, frame):
+        for name, values in self._columns.items():
+            frame[name] = values[:self._count]
+        return frame
+
+    def _store_statistics(self, statistics):
+        # statistics: {coluna: valores dos subgrupos novos} (ver _subgroup_statistics)
+        extra = len(next(iter(statistics.values())))
+        for name, values in statistics.items():
+            column = _reserve(self._columns.get(name, np.empty(0, dtype=np.asarray(values).dtype)), self._count, extra)
+            column[self._count:self._count + extra] = values
+            self._columns[name] = column
+        self._count += extra
+        self._df = None
+
+    def _check_subgroups(self, rows):
+        return rows
+
+    def extend(self, subgroups, sample_ids=None):
+        # Atualiza estatísticas e limites pelas somas acumuladas, sem copiar o histórico nem replotar;
+        # subgrupos incompletos são completados com NaN, como na leitura inicial
+        rows = self._check_subgroups(_subgroup_matrix(subgroups))
+        statistics = self._subgroup_statistics(rows)
+        if sample_ids is None:
+            sample_ids = [str(self._count + i + 1) for i in range(len(rows))]
+        added = len(self._added_ids)
+        width = max(self._added.shape[1], rows.shape[1])
+        self._added = _reserve(_pad(self._added, width), added, len(rows))
+        self._added[added:added + len(rows)] = _pad(rows, width)
+        self._added_ids.extend(sample_ids)
+        self._subgroups = None
+        self._store_statistics(statistics)
+        self.update_limits()
+
+    def append_subgroup(self, values, sample_id=None):
+        self.extend([values], None if sample_id is None else [sample_id])
+
+    def set_default_specification_limits(self):
+        temp_x_bar = np.nanmean(self.subgroups, axis=1).mean()
+        temp_std = np.nanstd(self.subgroups)
+        self.lse = temp_x_bar + (3 * temp_std)
+        self.lie = temp_x_bar - (3 * temp_std)
+        self.analysis = None
+        print(f"📊 Limites de especificação padrão definidos:")
+        print(f"   LSE (Limite Superior): {self.lse:.4f}")
+        print(f"   LIE (Limite Inferior): {self.lie:.4f}")
+
+
+def _subgroup_matrix(dados) -> np.ndarray:
+    rows = list(dados)
+    try:
+        return np.array(rows, dtype=np.float64)
+    except ValueError:
+        # Subgrupos de tamanhos diferentes: completa com NaN, como fazia apply(pd.Series)
+        width = max(len(row) for row in rows)
+        matrix = np.full((len(rows), width), np.nan)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+        return matrix
+
+
+def _reserve(buffer, count, extra):
+    # Capacidade dobra quando enche (como em IMR_graph): cópia amortizada O(1) por linha
+    if count + extra <= len(buffer):
+        return buffer
+    grown = np.empty((max(2 * len(buffer), count + extra),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:count] = buffer[:count]
+    return grown
+
+
+def _pad(matrix, width):
+    if matrix.shape[1] == width:
+        return matrix
+    return np.hstack([matrix, np.full((matrix.shape[0], width - matrix.shape[1]), np.nan)])
+
+
+_MAX_TOKEN_TAIL = 16  # maior literal JSON cortado no fim de um bloco ("-Infinity", "false", ...)
+
+
+def iter_json_records(url, chunk_size=10000, block_size=1 << 20):
+    # Parser incremental de um array JSON de nível superior: lê blocos de
+    # block_size caracteres e devolve listas de até chunk_size registros
+    decoder = json.JSONDecoder()
+    with open(url, 'r', encoding='utf-8') as f:
+        buffer = ""
+        pos = 0
+        eof = False
+        n_records = 0
+        chunk = []
+
+        def next_char():
+            nonlocal buffer, pos, eof
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return buffer[pos] if pos < len(buffer) else ""
+                block = f.read(block_size)
+                eof = not block
+                buffer = buffer[pos:] + block
+                pos = 0
+
+        if next_char() != "[":
+            raise ValueError(f"Erro ao ler {url}: o modo streaming espera um array JSON de registros")
+        pos += 1
+        if next_char() == "]":
+            return
+        while True:
+            next_char()
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError as e:
+                # Só é registro incompleto se o erro estiver no fim do bloco (valor ou string
+                # cortados); erro no meio do buffer é JSON inválido e sai sem ler o resto do arquivo
+                if eof or not (len(buffer) - e.pos <= _MAX_TOKEN_TAIL or e.msg.startswith("Unterminated string")):
+                    raise ValueError(f"Erro ao ler {url}: JSON inválido no registro {n_records + 1}: {e}") from e
+                complete = False
+            if not complete:
+                block = f.read(block_size)
+                eof = not block
+                buffer = buffer[pos:] + block
+                pos = 0
+                continue
+            pos = end
+            n_records += 1
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+            separator = next_char()
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Erro ao ler {url}: esperado ',' ou ']' após o registro {n_records}")
+            pos += 1
+        if chunk:
+            yield chunk
+
+
+def _allocate_column(sample, capacity):
+    if isinstance(sample, list):
+        return np.empty((capacity, len(sample)), dtype=np.float64)
+    if isinstance(sample, bool):
+        return np.empty(capacity, dtype=bool)
+    if isinstance(sample, int):
+        return np.empty(capacity, dtype=np.int64)
+    if isinstance(sample, float):
+        return np.empty(capacity, dtype=np.float64)
+    return np.empty(capacity, dtype=object)
+
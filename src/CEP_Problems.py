@@ -1,6 +1,8 @@
 from abc import ABC
 import math
+import numpy as np
 from scipy.stats import norm, binom
+from scipy.special import ndtr, bdtrc
 
 class CEP_Problems(ABC):
     
@@ -18,7 +20,76 @@ class CEP_Problems(ABC):
         return p_aceitacao, p_aproveitar
 
     @staticmethod
-    def generate_problems_report( p_aceitacao=None, p_aproveitar=None, sigma_deslocamento=None, n=None, k_lim=None, N=None, minimo_aceitos=None):
+    def cep_probabilidade_grid(sigma_xbar, sigma, n, k_lim, N=1, minimo_aceitos=1, outer=False):
+        # Versão vetorizada de cep_probabilidade, com a mesma convenção: média deslocada de sigma
+        # (na unidade de sigma_xbar) e limites em ±k·sigma_xbar, então
+        #   p_aceitacao = Φ(k - sigma/sigma_xbar) - Φ(-k - sigma/sigma_xbar)
+        #   p_aproveitar = P(Binomial(N, p_aceitacao) ≥ minimo_aceitos)
+        # Cada parâmetro pode ser escalar ou array (broadcasting do NumPy); n só entra na forma do
+        # resultado, como no escalar (sigma_xbar já o incorpora). outer=True combina todos os valores
+        # (superfície com um eixo por parâmetro, na ordem dos argumentos)
+        params = [np.asarray(value, dtype=np.float64) for value in (sigma_xbar, sigma, n, k_lim)]
+        params += [_integer_array(N, "N"), _integer_array(minimo_aceitos, "minimo_aceitos")]
+        if outer:
+            params = np.ix_(*[value.ravel() for value in params])
+        sigma_xbar, shift, n, k_lim, N, minimo_aceitos = np.broadcast_arrays(*params)
+        if np.any(n < 1):
+            raise ValueError("Tamanho da amostra (n) deve ser ≥ 1.")
+        if np.any(sigma_xbar <= 0):
+            raise ValueError("Desvio-padrão de X̄ (sigma_xbar) deve ser > 0.")
+        center = shift / sigma_xbar
+        p_aceitacao = ndtr(k_lim - center) - ndtr(-k_lim - center)
+        # bdtrc(k, N, p) = P(X > k) com k e N inteiros; k fora de [-1, N] vira 1 (mínimo ≤ 0) ou 0 (mínimo > N)
+        p_aproveitar = bdtrc(np.clip(minimo_aceitos - 1, -1, N), N, p_aceitacao)
+        return p_aceitacao, p_aproveitar
+
+    @staticmethod
+    def curva_oc(deslocamentos, n_values, k_lim=3, N=None, minimo_aceitos=None):
+        # Curvas OC (probabilidade de aceitação x deslocamento) para cada n, em uma chamada.
+        # deslocamentos em σ do processo: para cada n, σ de X̄ = σ/√n (com σ = 1)
+        deslocamentos = np.asarray(deslocamentos, dtype=np.float64).ravel()
+        n_values = np.asarray(n_values).ravel()
+        if np.any(n_values < 1):
+            raise ValueError("Tamanho da amostra (n) deve ser ≥ 1.")
+        with_plan = N is not None and minimo_aceitos is not None
+        p_aceitacao, p_aproveitar = CEP_Problems.cep_probabilidade_grid(
+            1 / np.sqrt(n_values[None, :]), deslocamentos[:, None], n_values[None, :], k_lim,
+            N if with_plan else 1, minimo_aceitos if with_plan else 1
+        )
+        return {
+            "deslocamentos": deslocamentos,
+            "n_values": n_values,
+            "k_lim": k_lim,
+            "N": N,
+            "minimo_aceitos": minimo_aceitos,
+            "p_aceitacao": p_aceitacao,
+            "p_aproveitar": p_aproveitar if with_plan else None
+        }
+
+    @staticmethod
+    def plot_curva_oc(curva, output_png=None, render_profile=None) -> bytes:
+        import matplotlib.pyplot as plt
+        import chart_rendering
+        panels = 2 if curva["p_aproveitar"] is not None else 1
+        fig, axes = plt.subplots(1, panels, figsize=(8 * panels, 6), squeeze=False)
+        series = [(axes[0][0], curva["p_aceitacao"], f'Curva OC (k = {curva["k_lim"]}σ)', 'P(aceitação por amostra)')]
+        if panels == 2:
+            series.append((axes[0][1], curva["p_aproveitar"], f'Aproveitar ≥ {curva["minimo_aceitos"]} de {curva["N"]}', 'P(aproveitar)'))
+        for ax, values, title, ylabel in series:
+            for j, n in enumerate(curva["n_values"]):
+                ax.plot(curva["deslocamentos"], values[:, j], linewidth=2, label=f'n = {n}')
+            ax.set_title(title, fontsize=14, fontweight='bold')
+            ax.set_xlabel('Deslocamento da média (σ do processo)', fontsize=12)
+            ax.set_ylabel(ylabel, fontsize=12)
+            ax.set_ylim(-0.02, 1.02)
+            ax.grid(True, alpha=0.3)
+            ax.legend(loc='upper right', fontsize=10)
+        profile = chart_rendering.resolve_profile(render_profile)
+        return chart_rendering.render_png({"fig": fig}, profile, output_png)
+
+    @staticmethod
+    def generate_problems_report( p_aceitacao=None, p_aproveitar=None, sigma_deslocamento=None, n=None, k_lim=None, N=None, minimo_aceitos=None, curva_oc=None):
+        # curva_oc: resultado de CEP_Problems.curva_oc, adiciona a seção com o gráfico das curvas OC
         from datetime import datetime
         report_date = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         html_content = f"""<!DOCTYPE html>
@@ -58,7 +129,7 @@ class CEP_Problems(ABC):
                 <h3 class="text-lg font-semibold text-gray-700 mb-3">Parâmetros do Processo</h3>
                 <div class="bg-gray-50 rounded-lg p-4 space-y-2">
                     <div class="flex justify-between">
-                        <span class="text-gray-600">Deslocamento (σ):</span>
+                        <span class="text-gray-600">Deslocamento (σ de X̄):</span>
                         <span class="font-mono font-bold">{sigma_deslocamento}</span>
                     </div>
                     <div class="flex justify-between">
@@ -94,6 +165,22 @@ class CEP_Problems(ABC):
             </div>
         </div>
     </div>
+"""
+        if curva_oc is not None:
+            import chart_rendering
+            image = chart_rendering.png_data_uri(CEP_Problems.plot_curva_oc(curva_oc))
+            n_list = ", ".join(str(value) for value in curva_oc["n_values"])
+            html_content += f"""
+    <div class="bg-white shadow-md rounded-lg p-6 mb-6">
+        <h2 class="text-2xl font-bold text-gray-800 mb-4 border-b pb-2">
+            Curvas Características de Operação (OC)
+        </h2>
+        <p class="text-gray-600 mb-4">
+            Probabilidade de aceitação em função do deslocamento da média, em σ do processo
+            (σ de X̄ = σ/√n), para n = {n_list} (limites de controle em ±{curva_oc["k_lim"]}σ de X̄).
+        </p>
+        <img src="{image}" alt="Curvas OC" class="w-full">
+    </div>
 """
         html_content += """
     <div class="text-center text-gray-500 text-sm mt-8 py-4 border-t">
@@ -108,3 +195,13 @@ class CEP_Problems(ABC):
 """
         return html_content
 
+
+def _integer_array(value, name: str) -> np.ndarray:
+    # N e minimo_aceitos são contagens: 10.0 é aceito, 10.5 não é truncado em silêncio
+    array = np.asarray(value)
+    if array.dtype.kind in "iu":
+        return array.astype(np.int64)
+    as_float = array.astype(np.float64)
+    if not np.all(np.isfinite(as_float)) or np.any(as_float != np.round(as_float)):
+        raise ValueError(f"{name} deve ser inteiro (recebido {value})")
+    return as_float.astype(np.int64)
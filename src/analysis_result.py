@@ -0,0 +1,221 @@
+from dataclasses import dataclass, asdict, field
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import western_electric_rules as wer
+import capability_intervals
+from process_capability import ProcessCapability
+
+
+# Resultado único e imutável da análise de um gráfico: máscaras fora de controle,
+# regras Western Electric e capacidade são calculadas uma vez (analyze_xr / analyze_xs / analyze_imr / analyze_x)
+# e consumidas pelo resumo no console, pelo report_bridge e por exportadores (to_dict).
+
+
+@dataclass(frozen=True)
+class SeriesAnalysis:
+    name: str
+    values: np.ndarray
+    lc: float
+    lsc: float
+    lic: float
+    out_of_control: np.ndarray  # máscara booleana por ponto
+    violations: Dict[str, Tuple[dict, ...]]
+    state: str
+
+    @property
+    def n_out_of_control(self) -> int:
+        return int(self.out_of_control.sum())
+
+    @property
+    def total_violations(self) -> int:
+        return sum(len(v) for v in self.violations.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "lc": float(self.lc),
+            "lsc": float(self.lsc),
+            "lic": float(self.lic),
+            "out_of_control": np.flatnonzero(self.out_of_control).tolist(),
+            "violations": {rule: [dict(v) for v in items] for rule, items in self.violations.items()},
+            "state": self.state
+        }
+
+
+@dataclass(frozen=True)
+class CapabilitySummary:
+    lse: float
+    lie: float
+    process_mean: float
+    sigma: float
+    rcp: Optional[float]
+    rcpk: Optional[float]
+    rcps: Optional[float]
+    rcpi: Optional[float]
+    rcp_interpretation: str
+    rcpk_interpretation: str
+    centralization_pct: float
+    is_centered: bool
+    success_probability: Optional[float]
+    # Intervalos de confiança (ver capability_intervals), só quando o gráfico os pediu
+    rcp_ci: Optional[Tuple[float, float]] = None
+    rcpk_ci: Optional[Tuple[float, float]] = None
+    interval_method: str = ""
+    interval_confidence: float = 0.0
+
+
+@dataclass(frozen=True)
+class ChartAnalysisResult:
+    chart_type: str  # "XR", "XS", "IMR" ou "X"
+    sigma: float
+    x: SeriesAnalysis
+    r: Optional[SeriesAnalysis] = None  # R, S ou MR, conforme chart_type
+    capability: Optional[CapabilitySummary] = None
+    # WesternElectricAnalyzer de cada série, na ordem (x, r); expostos no gráfico como analyzer_*
+    analyzers: Tuple = field(default=(), repr=False, compare=False)
+    # ProcessCapability que gerou o resumo (interpret_*, calculate_*), exposto no gráfico como capability
+    process_capability: Optional[ProcessCapability] = field(default=None, repr=False, compare=False)
+
+    def summary_lines(self) -> List[str]:
+        if self.r is None:
+            return [f"Quantidade de termos fora dos limites de controle: {self.x.n_out_of_control}"]
+        first = "X" if self.chart_type == "IMR" else "X-barra"
+        second = {"XS": "S", "IMR": "MR"}.get(self.chart_type, "R")
+        return [
+            f"Quantidade de termos fora dos limites de controle ({first}): {self.x.n_out_of_control}",
+            f"Quantidade de termos fora dos limites de controle ({second}): {self.r.n_out_of_control}",
+            f"Total de termos fora dos limites de controle: {self.x.n_out_of_control + self.r.n_out_of_control}"
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "chart_type": self.chart_type,
+            "sigma": float(self.sigma),
+            "x": self.x.to_dict(),
+            "r": self.r.to_dict() if self.r is not None else None,
+            "capability": asdict(self.capability) if self.capability is not None else None
+        }
+
+
+def analyze_xr(instance) -> ChartAnalysisResult:
+    x_bar = _frozen(instance.df['X_bar'])
+    r = _frozen(instance.df['R'])
+    analyzer_x, analyzer_r = wer.analyze_xr_chart(instance)
+    capability, process_capability = analyze_capability(instance.sigma, instance.x_double_mean, instance.lse, instance.lie, partial(capability_intervals.chart_intervals, instance, "XR"))
+    return ChartAnalysisResult(
+        chart_type="XR",
+        sigma=instance.sigma,
+        x=_series(analyzer_x, x_bar, (x_bar > instance.lsc_x_bar_graph) | (x_bar < instance.lic_x_bar_graph)),
+        r=_series(analyzer_r, r, r > instance.lsc_r_bar_graph),
+        capability=capability,
+        analyzers=(analyzer_x, analyzer_r),
+        process_capability=process_capability
+    )
+
+
+def analyze_xs(instance) -> ChartAnalysisResult:
+    # Máscaras pelos limites por subgrupo (iguais aos escalares quando n é constante)
+    x_bar = _frozen(instance.df['X_bar'])
+    s = _frozen(instance.df['S'])
+    analyzer_x, analyzer_s = wer.analyze_xs_chart(instance)
+    capability, process_capability = analyze_capability(instance.sigma, instance.x_double_mean, instance.lse, instance.lie, partial(capability_intervals.chart_intervals, instance, "XS"))
+    return ChartAnalysisResult(
+        chart_type="XS",
+        sigma=instance.sigma,
+        x=_series(analyzer_x, x_bar, (x_bar > instance.df['LSC_X'].to_numpy()) | (x_bar < instance.df['LIC_X'].to_numpy())),
+        r=_series(analyzer_s, s, s > instance.df['LSC_S'].to_numpy()),
+        capability=capability,
+        analyzers=(analyzer_x, analyzer_s),
+        process_capability=process_capability
+    )
+
+
+def analyze_imr(instance) -> ChartAnalysisResult:
+    values = _frozen(instance.df['Valor'])
+    mr = _frozen(instance.df['MR'])
+    analyzer_x, analyzer_mr = wer.analyze_imr_chart(instance)
+    capability, process_capability = analyze_capability(instance.sigma, instance.x_mean, instance.lse, instance.lie, partial(capability_intervals.chart_intervals, instance, "IMR"))
+    return ChartAnalysisResult(
+        chart_type="IMR",
+        sigma=instance.sigma,
+        x=_series(analyzer_x, values, (values > instance.lsc_x_graph) | (values < instance.lic_x_graph)),
+        r=_series(analyzer_mr, mr, (mr > instance.lsc_mr_graph) | (mr < instance.lic_mr_graph)),
+        capability=capability,
+        analyzers=(analyzer_x, analyzer_mr),
+        process_capability=process_capability
+    )
+
+
+def analyze_x(instance) -> ChartAnalysisResult:
+    values = _frozen(instance.df['Valor'])
+    analyzer_x = wer.analyze_x_chart(instance)
+    capability, process_capability = analyze_capability(instance.sigma, instance.x_mean, instance.lse, instance.lie, partial(capability_intervals.chart_intervals, instance, "X"))
+    return ChartAnalysisResult(
+        chart_type="X",
+        sigma=instance.sigma,
+        x=_series(analyzer_x, values, (values > instance.lsc_x_graph) | (values < instance.lic_x_graph)),
+        capability=capability,
+        analyzers=(analyzer_x,),
+        process_capability=process_capability
+    )
+
+
+# Análise de cada gráfico de variáveis, pela chave chart_type (ver AbstractCEP.AbstractVariablesChart)
+ANALYZERS = {"XR": analyze_xr, "XS": analyze_xs, "IMR": analyze_imr, "X": analyze_x}
+
+
+def analyze_capability(sigma: float, process_mean: float, lse: Optional[float], lie: Optional[float], intervals: Optional[Callable] = None) -> Tuple[Optional[CapabilitySummary], Optional[ProcessCapability]]:
+    # (resumo imutável, ProcessCapability calculado uma única vez); (None, None) sem limites de especificação
+    # intervals(rcp, rcpk) -> CapabilityIntervals ou None (ver capability_intervals.chart_intervals)
+    if lse is None or lie is None:
+        return None, None
+    capability = ProcessCapability(sigma=sigma, lse=lse, lie=lie)
+    capability.set_process_mean(process_mean)
+    capability.calculate_all()
+    half_width = (lse - lie) / 2
+    offset = abs(process_mean - (lse + lie) / 2)
+    ci = intervals(capability.rcp, capability.rcpk) if intervals is not None else None
+    if ci is not None:
+        capability.rcp_ci, capability.rcpk_ci = ci.rcp, ci.rcpk
+    summary = CapabilitySummary(
+        lse=lse,
+        lie=lie,
+        process_mean=process_mean,
+        sigma=sigma,
+        rcp=capability.rcp,
+        rcpk=capability.rcpk,
+        rcps=capability.rcps,
+        rcpi=capability.rcpi,
+        rcp_interpretation=capability.interpret_rcp(),
+        rcpk_interpretation=capability.interpret_rcpk(),
+        centralization_pct=offset / half_width * 100 if lse != lie else 0.0,
+        is_centered=offset <= 0.1 * (lse - lie) if lse != lie else True,
+        success_probability=capability.calculate_success_probability(),
+        rcp_ci=ci.rcp if ci is not None else None,
+        rcpk_ci=ci.rcpk if ci is not None else None,
+        interval_method=ci.method if ci is not None else "",
+        interval_confidence=ci.confidence if ci is not None else 0.0
+    )
+    return summary, capability
+
+
+def _frozen(values) -> np.ndarray:
+    array = np.array(values, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+def _series(analyzer, values: np.ndarray, out_of_control: np.ndarray) -> SeriesAnalysis:
+    out_of_control = np.asarray(out_of_control, dtype=bool)
+    out_of_control.flags.writeable = False
+    return SeriesAnalysis(
+        name=analyzer.chart_name,
+        values=values,
+        lc=analyzer.lc,
+        lsc=analyzer.lsc,
+        lic=analyzer.lic,
+        out_of_control=out_of_control,
+        violations={rule: tuple(items) for rule, items in analyzer.violations.items()},
+        state=analyzer.state
+    )
@@ -0,0 +1,213 @@
+import numpy as np
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+from scipy.special import ndtr
+
+
+# Comprimento médio de sequência (ARL) das regras Western Electric para pontos
+# independentes z ~ N(δ, 1), com δ o deslocamento da média em unidades do σ do
+# gráfico (para X̄ com subgrupos de n, δ = deslocamento em σ do processo · √n).
+# As regras seguem WesternElectricMonitor: janelas só contam quando completas.
+#   arl_markov: valor exato pela cadeia de Markov absorvente (zonas dos últimos pontos)
+#   arl_monte_carlo: estimativa simulando milhares de sequências por lote (vetorizado)
+RULES = ("rule1", "rule2", "rule3", "rule4")
+RULE_SETS = {
+    "rule1": ("rule1",),
+    "rule2": ("rule2",),
+    "rule3": ("rule3",),
+    "rule4": ("rule4",),
+    "combinadas": RULES
+}
+
+# Zonas de um ponto: (-∞,-3) [-3,-2) [-2,-1) [-1,0) [0,1) [1,2) [2,3) [3,∞)
+_ZONE_EDGES = np.array([-3.0, -2.0, -1.0, 0.0, 1.0, 2.0, 3.0])
+_N_ZONES = 8
+# (regra, janela, mínimo de pontos, zona limite): ponto conta se |z| passa da zona limite
+_WINDOW_RULES = (("rule2", 3, 2, 2.0), ("rule3", 5, 4, 1.0), ("rule4", 8, 8, 0.0))
+_CARRY = 7  # pontos anteriores necessários para avaliar a maior janela (8)
+
+
+@dataclass(frozen=True)
+class ARLEstimate:
+    shift: float
+    rules: Tuple[str, ...]
+    arl: float
+    std_error: float
+    n_runs: int
+    censored: int  # sequências sem sinal até max_length (contadas como max_length)
+
+
+def zone_probabilities(shift: float) -> np.ndarray:
+    cdf = ndtr(_ZONE_EDGES - shift)
+    return np.diff(np.concatenate(([0.0], cdf, [1.0])))
+
+
+def arl_markov(shift, rules: Iterable[str] = RULES):
+    # Aceita escalar ou array de deslocamentos; a estrutura da cadeia é montada uma vez
+    rules = _check_rules(rules)
+    sources, targets, zones, n_states = _chain_structure(rules)
+    shifts = np.asarray(shift, dtype=np.float64)
+    result = np.empty(shifts.shape)
+    identity = sparse.identity(n_states, format='csr')
+    for index, value in np.ndenumerate(shifts):
+        probabilities = zone_probabilities(value)
+        transitions = sparse.csr_matrix((probabilities[zones], (sources, targets)), shape=(n_states, n_states))
+        # ARL = (I - Q)^-1 · 1 a partir do estado inicial (sem histórico)
+        result[index] = spsolve((identity - transitions).tocsc(), np.ones(n_states))[0]
+    return float(result) if result.ndim == 0 else result
+
+
+def _check_rules(rules) -> Tuple[str, ...]:
+    rules = tuple(rules)
+    unknown = [rule for rule in rules if rule not in RULES]
+    if unknown or not rules:
+        raise ValueError(f"Regras inválidas: {unknown or rules} (esperado subconjunto de {RULES})")
+    return tuple(rule for rule in RULES if rule in rules)
+
+
+def _chain_structure(rules: Tuple[str, ...]):
+    # Estado: (zonas dos últimos pontos, lado e tamanho da sequência do mesmo lado da LC).
+    # Só o histórico exigido pelas regras ativas é guardado; os estados são enumerados
+    # a partir do inicial, e as transições que sinalizam saem da matriz (absorção).
+    history_length = 4 if "rule3" in rules else 2 if "rule2" in rules else 0
+    track_run = "rule4" in rules
+    start = ((), 0, 0)
+    index = {start: 0}
+    pending = [start]
+    sources, targets, zones = [], [], []
+    while pending:
+        state = pending.pop()
+        history, side, run = state
+        for zone in range(_N_ZONES):
+            if _signals(rules, history, side, run, zone):
+                continue
+            zone_side = 1 if zone >= 4 else -1
+            next_run = (run + 1 if zone_side == side else 1) if track_run else 0
+            next_state = (
+                (history + (zone,))[-history_length:] if history_length else (),
+                zone_side if track_run else 0,
+                next_run
+            )
+            if next_state not in index:
+                index[next_state] = len(index)
+                pending.append(next_state)
+            sources.append(index[state])
+            targets.append(index[next_state])
+            zones.append(zone)
+    return np.array(sources), np.array(targets), np.array(zones), len(index)
+
+
+def _signals(rules, history, side, run, zone) -> bool:
+    if "rule1" in rules and zone in (0, _N_ZONES - 1):
+        return True
+    points = history + (zone,)
+    for rule, window, minimum, level in _WINDOW_RULES[:2]:
+        if rule in rules and len(points) >= window:
+            last = points[-window:]
+            # Zonas acima de +k: índice ≥ 4 + k; abaixo de -k: índice ≤ 3 - k
+            level = int(level)
+            if sum(z >= 4 + level for z in last) >= minimum or sum(z <= 3 - level for z in last) >= minimum:
+                return True
+    if "rule4" in rules:
+        zone_side = 1 if zone >= 4 else -1
+        if zone_side == side and run + 1 >= 8:
+            return True
+    return False
+
+
+def first_signals(block: np.ndarray, rules: Iterable[str] = RULES, offset: int = 0, carry: int = 0) -> np.ndarray:
+    # block: (sequências, pontos) com `carry` pontos anteriores no início de cada linha.
+    # Devolve a posição (1-based, contando `offset` pontos já vistos) do primeiro sinal
+    # em cada linha, ou 0 se não houver. Janelas que começariam antes do 1º ponto não contam.
+    rules = _check_rules(rules)
+    n_rows, width = block.shape
+    signal = np.zeros((n_rows, width - carry), dtype=bool)
+    if "rule1" in rules:
+        signal |= np.abs(block[:, carry:]) > 3
+    for rule, window, minimum, level in _WINDOW_RULES:
+        if rule not in rules:
+            continue
+        for flags in (block > level, block < -level):
+            cumulative = np.zeros((n_rows, width + 1), dtype=np.int32)
+            np.cumsum(flags, axis=1, out=cumulative[:, 1:])
+            # Contagem da janela que termina em cada ponto do bloco (após o carry)
+            ends = np.arange(carry, width)
+            counts = cumulative[:, ends + 1] - cumulative[:, np.maximum(ends + 1 - window, 0)]
+            full = offset + ends - carry >= window - 1
+            signal |= (counts >= minimum) & full
+    hit = signal.any(axis=1)
+    return np.where(hit, offset + signal.argmax(axis=1) + 1, 0)
+
+
+def simulate_run_lengths(shift: float, rules: Iterable[str] = RULES, n_runs: int = 4096, seed=None, chunk_size: int = 512, max_length: int = 100000) -> np.ndarray:
+    # Todas as sequências avançam juntas em blocos de chunk_size pontos; as que já sinalizaram
+    # saem do lote. Os últimos 7 pontos passam ao bloco seguinte, então as janelas são exatas.
+    rules = _check_rules(rules)
+    rng = np.random.default_rng(seed)
+    run_lengths = np.full(n_runs, max_length, dtype=np.int64)
+    active = np.arange(n_runs)
+    carry = np.empty((n_runs, 0))
+    offset = 0
+    while len(active) and offset < max_length:
+        points = rng.standard_normal((len(active), min(chunk_size, max_length - offset))) + shift
+        block = np.hstack([carry, points])
+        found = first_signals(block, rules, offset, carry.shape[1])
+        stopped = found > 0
+        run_lengths[active[stopped]] = found[stopped]
+        active = active[~stopped]
+        carry = block[~stopped, -_CARRY:]
+        offset += points.shape[1]
+    return run_lengths
+
+
+def _simulate_batch(args):
+    shift, rules, n_runs, seed, chunk_size, max_length = args
+    return simulate_run_lengths(shift, rules, n_runs, seed, chunk_size, max_length)
+
+
+def arl_monte_carlo(shift, rules: Iterable[str] = RULES, n_runs: int = 20000, seed: Optional[int] = 0, batch_size: int = 4096, max_workers: Optional[int] = None, chunk_size: int = 512, max_length: int = 100000):
+    # Lotes de batch_size sequências com sementes derivadas de `seed` (SeedSequence.spawn):
+    # o resultado é o mesmo com ou sem processos paralelos (max_workers > 1)
+    rules = _check_rules(rules)
+    shifts = np.atleast_1d(np.asarray(shift, dtype=np.float64))
+    sizes = [min(batch_size, n_runs - start) for start in range(0, n_runs, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(shifts) * len(sizes))
+    tasks = [
+        (float(value), rules, size, seeds[i * len(sizes) + j], chunk_size, max_length)
+        for i, value in enumerate(shifts)
+        for j, size in enumerate(sizes)
+    ]
+    if max_workers is not None and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            batches = list(executor.map(_simulate_batch, tasks))
+    else:
+        batches = [_simulate_batch(task) for task in tasks]
+    estimates = []
+    for i, value in enumerate(shifts):
+        run_lengths = np.concatenate(batches[i * len(sizes):(i + 1) * len(sizes)])
+        estimates.append(ARLEstimate(
+            shift=float(value),
+            rules=rules,
+            arl=float(run_lengths.mean()),
+            std_error=float(run_lengths.std(ddof=1) / np.sqrt(len(run_lengths))) if len(run_lengths) > 1 else float("nan"),
+            n_runs=len(run_lengths),
+            censored=int(np.sum(run_lengths >= max_length))
+        ))
+    return estimates[0] if np.ndim(shift) == 0 else estimates
+
+
+def arl_table(shifts, rule_sets: Optional[Dict[str, Tuple[str, ...]]] = None, method: str = "markov", **options) -> Dict[str, List[float]]:
+    # ARL por conjunto de regras (individuais e combinadas) para cada deslocamento
+    rule_sets = rule_sets or RULE_SETS
+    table = {}
+    for name, rules in rule_sets.items():
+        if method == "markov":
+            table[name] = np.atleast_1d(arl_markov(shifts, rules)).tolist()
+        elif method == "monte_carlo":
+            table[name] = [estimate.arl for estimate in arl_monte_carlo(np.atleast_1d(shifts), rules, **options)]
+        else:
+            raise ValueError(f"Método de ARL desconhecido: {method} (esperado 'markov' ou 'monte_carlo')")
+    return table
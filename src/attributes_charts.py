@@ -4,6 +4,10 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 import base64
 import AbstractCEP as AbstractCEP
+import chart_rendering
+import svg_chart
+import html_table
+from html_report_generator import ROW_CHUNK_SIZE, format_fixed, as_text, join_rows
 
 
 def _detect_column(df, candidates):
@@ -22,11 +26,111 @@ def _encode_image(image_path):
         return ""
 
 
+def _build_attribute_figure(series_label, ylabel):
+    fig, ax = plt.subplots(1, 1, figsize=(16, 8))
+    template = {"fig": fig, "ax": ax}
+    template["series"], = ax.plot([], [], 'bo-', linewidth=2, markersize=6, label=series_label)
+    template["lc"], = ax.plot([], [], color='green', linestyle='-', linewidth=2)
+    template["ucl"], = ax.plot([], [], color='red', linestyle='--', linewidth=2, label='LSC')
+    template["lcl"], = ax.plot([], [], color='red', linestyle='--', linewidth=2, label='LIC')
+    ax.set_xlabel('Amostra', fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.grid(True, alpha=0.3)
+    return template
+
+
+def _update_attribute_figure(template, df, series_column, center):
+    ax = template["ax"]
+    x = chart_rendering.sample_positions(df['Amostra'])
+    template["series"].set_data(x, df[series_column])
+    template["lc"].set_data(x, df['LC'])
+    template["lc"].set_label(f'LC = {center:.4f}')
+    template["ucl"].set_data(x, df['UCL'])
+    template["lcl"].set_data(x, df['LCL'])
+    ax.legend(loc='upper right', fontsize=10)
+    ax.relim()
+    ax.autoscale_view()
+
+
+def _attribute_chart_spec(df, series_column, center, ylabel):
+    x = chart_rendering.sample_positions(df['Amostra'])
+    target = svg_chart.panel(x, xlabel='Amostra', ylabel=ylabel)
+    svg_chart.add_series(target, df[series_column], series_column, 'blue')
+    svg_chart.add_series(target, df['LC'], f'LC = {center:.4f}', 'green', markers=False)
+    svg_chart.add_series(target, df['UCL'], 'LSC', 'red', markers=False, dash=True)
+    svg_chart.add_series(target, df['LCL'], 'LIC', 'red', markers=False, dash=True)
+    return {"panels": [target]}
+
+
+def _write_attribute_table(f, df, n_col, defects_col, series_column, labels, table_mode="full"):
+    # labels: rótulos das colunas de tamanho e de contagem
+    n_label, defects_label = labels
+    if table_mode == "paged":
+        values = df[series_column].to_numpy(dtype=float)
+        spec = html_table.table(len(df))
+        html_table.add_column(spec, "Amostra", df['Amostra'].to_numpy().astype(np.int64))
+        html_table.add_column(spec, n_label, df[n_col].to_numpy().astype(np.int64), mono=True)
+        html_table.add_column(spec, defects_label, df[defects_col].to_numpy().astype(np.int64), mono=True)
+        out = html_table.add_column(spec, series_column, values, decimals=6, mono=True, out=df['Fora'].to_numpy(dtype=bool))
+        for column, label in (('UCL', "LSC"), ('LC', "LC"), ('LCL', "LIC")):
+            html_table.add_column(spec, label, df[column], decimals=6, mono=True)
+        html_table.add_status_column(spec, "Status", out)
+        f.write(html_table.render_table_html(spec, f"cep-table-{series_column}", title="Dados"))
+        return
+    f.write(f"""<div class=\"mb-8\">
+  <h2 class=\"text-lg font-semibold mb-2\">Dados</h2>
+  <div class=\"overflow-x-auto\">
+    <table class=\"min-w-full bg-white border rounded\">
+      <thead>
+        <tr class=\"bg-gray-100 text-gray-700\">
+          <th class=\"py-2 px-4 border-b\">Amostra</th>
+          <th class=\"py-2 px-4 border-b\">{n_label}</th>
+          <th class=\"py-2 px-4 border-b\">{defects_label}</th>
+          <th class=\"py-2 px-4 border-b\">{series_column}</th>
+          <th class=\"py-2 px-4 border-b\">LSC</th>
+          <th class=\"py-2 px-4 border-b\">LC</th>
+          <th class=\"py-2 px-4 border-b\">LIC</th>
+          <th class=\"py-2 px-4 border-b\">Status</th>
+        </tr>
+      </thead>
+      <tbody>
+""")
+    _write_attribute_rows(f, df, n_col, defects_col, series_column)
+    f.write("""
+      </tbody>
+    </table>
+  </div>
+</div>
+""")
+
+
+def _write_attribute_rows(f, df, n_col, defects_col, series_column):
+    # Linhas da tabela formatadas por bloco e escritas direto no arquivo
+    for start in range(0, len(df), ROW_CHUNK_SIZE):
+        chunk = df.iloc[start:start + ROW_CHUNK_SIZE]
+        f.write(join_rows([
+            '\n        <tr class="text-gray-700">\n',
+            '          <td class="py-2 px-4 border-b">', as_text(chunk['Amostra'].to_numpy().astype(np.int64)), '</td>\n',
+            '          <td class="py-2 px-4 border-b font-mono">', as_text(chunk[n_col].to_numpy().astype(np.int64)), '</td>\n',
+            '          <td class="py-2 px-4 border-b font-mono">', as_text(chunk[defects_col].to_numpy().astype(np.int64)), '</td>\n',
+            '          <td class="py-2 px-4 border-b font-mono">', format_fixed(chunk[series_column], 6), '</td>\n',
+            '          <td class="py-2 px-4 border-b font-mono">', format_fixed(chunk['UCL'], 6), '</td>\n',
+            '          <td class="py-2 px-4 border-b font-mono">', format_fixed(chunk['LC'], 6), '</td>\n',
+            '          <td class="py-2 px-4 border-b font-mono">', format_fixed(chunk['LCL'], 6), '</td>\n',
+            '          <td class="py-2 px-4 border-b text-center">', np.where(chunk['Fora'].to_numpy(dtype=bool), 'Fora', 'OK').astype(object), '</td>\n',
+            '        </tr>\n'
+        ]))
+
+
 class PChart(AbstractCEP.AbstractControlChart):
-    def __init__(self, df: pd.DataFrame | None = None, data_url: str = "json_files/p_chart_data.json", constants_url: str = "json_files/constantes_cep.json", output_png: str = 'grafico_controle_p.png', output_html: str = 'relatorio_cep_p.html'):
-        super().__init__(data_url=data_url, constants_url=constants_url)
+    def __init__(self, df: pd.DataFrame | None = None, data_url: str = "json_files/p_chart_data.json", constants_url: str = "json_files/constantes_cep.json", output_png: str = 'grafico_controle_p.png', output_html: str = 'relatorio_cep_p.html', streaming: bool = False, compute_only: bool = False, render_profile=None, chart_format: str = "png", table_mode: str = "full"):
+        super().__init__(data_url=data_url, constants_url=constants_url, streaming=streaming)
         self.output_png = output_png
         self.output_html = output_html
+        self.render_profile = render_profile
+        self.chart_png = None
+        self.chart_format = chart_format
+        self.table_mode = table_mode
         self.df = df.copy() if df is not None else (self.data.copy() if isinstance(self.data, pd.DataFrame) else pd.DataFrame(self.data))
         if 'Amostra' not in self.df.columns:
             self.df['Amostra'] = np.arange(1, len(self.df) + 1)
@@ -34,9 +138,14 @@ class PChart(AbstractCEP.AbstractControlChart):
         self.n_col = _detect_column(self.df, ['Inspecionados', 'Tamanho', 'Unidades'])
         self.pbar = None
 
+        self.png_path = None
+
         self.process()
-        self.png_path = self.plot(self.output_png)
-        self.generate_html(self.png_path, self.output_html)
+        # compute_only=True deixa plot()/generate_html() para quando forem pedidos
+        if not compute_only:
+            if self.chart_format == "png":
+                self.png_path = self.plot(self.output_png)
+            self.generate_html(self.png_path, self.output_html)
 
 
     def compute_proportions(self):
@@ -80,27 +189,28 @@ class PChart(AbstractCEP.AbstractControlChart):
     def plot(self, output_png: str = 'grafico_controle_p.png'):
         if 'UCL' not in self.df.columns:
             self.compute_limits()
-        x = self.df['Amostra']
-        plt.figure(figsize=(16, 8))
-        plt.plot(x, self.df['p'], 'bo-', linewidth=2, markersize=6, label='p')
-        plt.plot(x, self.df['LC'], color='green', linestyle='-', linewidth=2, label=f'LC = {self.pbar:.4f}')
-        plt.plot(x, self.df['UCL'], color='red', linestyle='--', linewidth=2, label='LSC')
-        plt.plot(x, self.df['LCL'], color='red', linestyle='--', linewidth=2, label='LIC')
-        plt.xlabel('Amostra', fontsize=12)
-        plt.ylabel('Proporção defeituosa (p)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.legend(loc='upper right', fontsize=10)
-        plt.tight_layout()
-        plt.savefig(output_png, dpi=300, bbox_inches='tight')
-        plt.close()
+        profile = chart_rendering.resolve_profile(self.render_profile)
+        template = chart_rendering.get_template("P", lambda: _build_attribute_figure('p', 'Proporção defeituosa (p)'), profile)
+        _update_attribute_figure(template, self.df, 'p', self.pbar)
+        # PNG fica em memória (chart_png) para o HTML; output_png=None dispensa o arquivo
+        self.chart_png = chart_rendering.render_png(template, profile, output_png)
         return output_png
 
+    def chart_spec(self):
+        if 'UCL' not in self.df.columns:
+            self.compute_limits()
+        return _attribute_chart_spec(self.df, 'p', self.pbar, 'Proporção defeituosa (p)')
+
     def analyze(self):
         return self.analyze_control_status()
 
-    def generate_html(self, image_path: str, output_file: str = 'relatorio_cep_p.html'):
+    def generate_html(self, image_path: str = None, output_file: str = 'relatorio_cep_p.html'):
         analysis = self.analyze_control_status()
-        img_b64 = _encode_image(image_path)
+        if self.chart_format == "svg":
+            chart_block = svg_chart.render_chart_html(self.chart_spec(), "cep-chart-p")
+        else:
+            img_b64 = chart_rendering.png_data_uri(self.chart_png) if self.chart_png else _encode_image(image_path)
+            chart_block = f'<img src="{img_b64}" alt="Gráfico P" class="max-w-full h-auto border rounded"/>' if img_b64 else f'<img src="{image_path}" alt="Gráfico P" class="max-w-full h-auto border rounded"/>'
         report_date = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
         html = f"""<!DOCTYPE html>
 <html lang=\"pt-BR\">
@@ -123,58 +233,27 @@ class PChart(AbstractCEP.AbstractControlChart):
 </div>
 <div class=\"mb-8\">
   <h2 class=\"text-lg font-semibold mb-4\">Gráfico de Controle P</h2>
-  {f'<img src="{img_b64}" alt="Gráfico P" class="max-w-full h-auto border rounded"/>' if img_b64 else f'<img src="{image_path}" alt="Gráfico P" class="max-w-full h-auto border rounded"/>'}
+  {chart_block}
 </div>
-<div class=\"mb-8\">
-  <h2 class=\"text-lg font-semibold mb-2\">Dados</h2>
-  <div class=\"overflow-x-auto\">
-    <table class=\"min-w-full bg-white border rounded\">
-      <thead>
-        <tr class=\"bg-gray-100 text-gray-700\">
-          <th class=\"py-2 px-4 border-b\">Amostra</th>
-          <th class=\"py-2 px-4 border-b\">Inspecionados</th>
-          <th class=\"py-2 px-4 border-b\">Defeituosos</th>
-          <th class=\"py-2 px-4 border-b\">p</th>
-          <th class=\"py-2 px-4 border-b\">LSC</th>
-          <th class=\"py-2 px-4 border-b\">LC</th>
-          <th class=\"py-2 px-4 border-b\">LIC</th>
-          <th class=\"py-2 px-4 border-b\">Status</th>
-        </tr>
-      </thead>
-      <tbody>
-"""
-        for _, row in self.df.iterrows():
-            status = 'Fora' if row['Fora'] else 'OK'
-            html += f"""
-        <tr class=\"text-gray-700\">
-          <td class=\"py-2 px-4 border-b\">{int(row['Amostra'])}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{int(row[self.n_col])}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{int(row[self.defects_col])}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['p']:.6f}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['UCL']:.6f}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['LC']:.6f}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['LCL']:.6f}</td>
-          <td class=\"py-2 px-4 border-b text-center\">{status}</td>
-        </tr>
-"""
-        html += """
-      </tbody>
-    </table>
-  </div>
-</div>
-</body>
-</html>
 """
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
+            _write_attribute_table(f, self.df, self.n_col, self.defects_col, 'p', ("Inspecionados", "Defeituosos"), self.table_mode)
+            f.write("""</body>
+</html>
+""")
         return output_file
 
 
 class UChart(AbstractCEP.AbstractControlChart):
-    def __init__(self, df: pd.DataFrame | None = None, data_url: str = "json_files/u_chart_data.json", constants_url: str = "json_files/constantes_cep.json", output_png: str = 'grafico_controle_u.png', output_html: str = 'relatorio_cep_u.html'):
-        super().__init__(data_url=data_url, constants_url=constants_url)
+    def __init__(self, df: pd.DataFrame | None = None, data_url: str = "json_files/u_chart_data.json", constants_url: str = "json_files/constantes_cep.json", output_png: str = 'grafico_controle_u.png', output_html: str = 'relatorio_cep_u.html', streaming: bool = False, compute_only: bool = False, render_profile=None, chart_format: str = "png", table_mode: str = "full"):
+        super().__init__(data_url=data_url, constants_url=constants_url, streaming=streaming)
         self.output_png = output_png
         self.output_html = output_html
+        self.render_profile = render_profile
+        self.chart_png = None
+        self.chart_format = chart_format
+        self.table_mode = table_mode
         self.df = df.copy() if df is not None else (self.data.copy() if isinstance(self.data, pd.DataFrame) else pd.DataFrame(self.data))
         if 'Amostra' not in self.df.columns:
             self.df['Amostra'] = np.arange(1, len(self.df) + 1)
@@ -182,9 +261,14 @@ class UChart(AbstractCEP.AbstractControlChart):
         self.n_col = _detect_column(self.df, ['Inspecionados', 'Unidades', 'Tamanho'])
         self.ubar = None
 
+        self.png_path = None
+
         self.process()
-        self.png_path = self.plot(self.output_png)
-        self.generate_html(self.png_path, self.output_html)
+        # compute_only=True deixa plot()/generate_html() para quando forem pedidos
+        if not compute_only:
+            if self.chart_format == "png":
+                self.png_path = self.plot(self.output_png)
+            self.generate_html(self.png_path, self.output_html)
 
     def compute_rates(self):
         self.df['u'] = self.df[self.defects_col] / self.df[self.n_col]
@@ -226,27 +310,28 @@ class UChart(AbstractCEP.AbstractControlChart):
     def plot(self, output_png: str = 'grafico_controle_u.png'):
         if 'UCL' not in self.df.columns:
             self.compute_limits()
-        x = self.df['Amostra']
-        plt.figure(figsize=(16, 8))
-        plt.plot(x, self.df['u'], 'bo-', linewidth=2, markersize=6, label='u')
-        plt.plot(x, self.df['LC'], color='green', linestyle='-', linewidth=2, label=f'LC = {self.ubar:.4f}')
-        plt.plot(x, self.df['UCL'], color='red', linestyle='--', linewidth=2, label='LSC')
-        plt.plot(x, self.df['LCL'], color='red', linestyle='--', linewidth=2, label='LIC')
-        plt.xlabel('Amostra', fontsize=12)
-        plt.ylabel('Não conformidades por unidade (u)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.legend(loc='upper right', fontsize=10)
-        plt.tight_layout()
-        plt.savefig(output_png, dpi=300, bbox_inches='tight')
-        plt.close()
+        profile = chart_rendering.resolve_profile(self.render_profile)
+        template = chart_rendering.get_template("U", lambda: _build_attribute_figure('u', 'Não conformidades por unidade (u)'), profile)
+        _update_attribute_figure(template, self.df, 'u', self.ubar)
+        # PNG fica em memória (chart_png) para o HTML; output_png=None dispensa o arquivo
+        self.chart_png = chart_rendering.render_png(template, profile, output_png)
         return output_png
 
+    def chart_spec(self):
+        if 'UCL' not in self.df.columns:
+            self.compute_limits()
+        return _attribute_chart_spec(self.df, 'u', self.ubar, 'Não conformidades por unidade (u)')
+
     def analyze(self):
         return self.analyze_control_status()
 
-    def generate_html(self, image_path: str, output_file: str = 'relatorio_cep_u.html'):
+    def generate_html(self, image_path: str = None, output_file: str = 'relatorio_cep_u.html'):
         analysis = self.analyze_control_status()
-        img_b64 = _encode_image(image_path)
+        if self.chart_format == "svg":
+            chart_block = svg_chart.render_chart_html(self.chart_spec(), "cep-chart-u")
+        else:
+            img_b64 = chart_rendering.png_data_uri(self.chart_png) if self.chart_png else _encode_image(image_path)
+            chart_block = f'<img src="{img_b64}" alt="Gráfico U" class="max-w-full h-auto border rounded"/>' if img_b64 else f'<img src="{image_path}" alt="Gráfico U" class="max-w-full h-auto border rounded"/>'
         report_date = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
         html = f"""<!DOCTYPE html>
 <html lang=\"pt-BR\">
@@ -269,48 +354,13 @@ class UChart(AbstractCEP.AbstractControlChart):
 </div>
 <div class=\"mb-8\">
   <h2 class=\"text-lg font-semibold mb-4\">Gráfico de Controle U</h2>
-  {f'<img src="{img_b64}" alt="Gráfico U" class="max-w-full h-auto border rounded"/>' if img_b64 else f'<img src="{image_path}" alt="Gráfico U" class="max-w-full h-auto border rounded"/>'}
-</div>
-<div class=\"mb-8\">
-  <h2 class=\"text-lg font-semibold mb-2\">Dados</h2>
-  <div class=\"overflow-x-auto\">
-    <table class=\"min-w-full bg-white border rounded\">
-      <thead>
-        <tr class=\"bg-gray-100 text-gray-700\">
-          <th class=\"py-2 px-4 border-b\">Amostra</th>
-          <th class=\"py-2 px-4 border-b\">Unidades</th>
-          <th class=\"py-2 px-4 border-b\">Não Conformidades</th>
-          <th class=\"py-2 px-4 border-b\">u</th>
-          <th class=\"py-2 px-4 border-b\">LSC</th>
-          <th class=\"py-2 px-4 border-b\">LC</th>
-          <th class=\"py-2 px-4 border-b\">LIC</th>
-          <th class=\"py-2 px-4 border-b\">Status</th>
-        </tr>
-      </thead>
-      <tbody>
-"""
-        for _, row in self.df.iterrows():
-            status = 'Fora' if row['Fora'] else 'OK'
-            html += f"""
-        <tr class=\"text-gray-700\">
-          <td class=\"py-2 px-4 border-b\">{int(row['Amostra'])}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{int(row[self.n_col])}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{int(row[self.defects_col])}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['u']:.6f}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['UCL']:.6f}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['LC']:.6f}</td>
-          <td class=\"py-2 px-4 border-b font-mono\">{row['LCL']:.6f}</td>
-          <td class=\"py-2 px-4 border-b text-center\">{status}</td>
-        </tr>
-"""
-        html += """
-      </tbody>
-    </table>
-  </div>
+  {chart_block}
 </div>
-</body>
-</html>
 """
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
+            _write_attribute_table(f, self.df, self.n_col, self.defects_col, 'u', ("Unidades", "Não Conformidades"), self.table_mode)
+            f.write("""</body>
+</html>
+""")
         return output_file
@@ -0,0 +1,153 @@
+import numpy as np
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from scipy import stats
+
+
+# Intervalos de confiança para RCP e RCPk.
+#   "analytic": RCP pelo qui-quadrado, RCP·√(χ²(α/2; ν)/ν) a RCP·√(χ²(1-α/2; ν)/ν), ν = N - 1;
+#               RCPk pela aproximação de Bissell, RCPk ± z·√(1/(9N) + RCPk²/(2(N-1)))
+#   "bootstrap": percentis de B réplicas reamostrando os subgrupos (linhas da matriz) com
+#               reposição e reaplicando o estimador de sigma do gráfico (R̄/d2, média de s/c4,
+#               desvio-padrão global ou MR̄/d2). Reamostrar linhas equivale a reamostrar as
+#               estatísticas por subgrupo, então cada réplica custa O(subgrupos), não O(medições).
+INTERVAL_METHODS = ("analytic", "bootstrap")
+_BATCH_ELEMENTS = 1 << 22  # elementos por lote vetorizado (réplicas x unidades reamostradas)
+
+
+@dataclass(frozen=True)
+class IntervalOptions:
+    method: str = "analytic"
+    confidence: float = 0.95
+    n_boot: int = 2000
+    seed: Optional[int] = 0
+    batch_size: int = 1000
+    max_workers: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class CapabilityIntervals:
+    method: str
+    confidence: float
+    rcp: Tuple[float, float]
+    rcpk: Tuple[float, float]
+    n_boot: int = 0
+
+
+def check_options(method: str = "analytic", confidence: float = 0.95, **bootstrap) -> IntervalOptions:
+    if method not in INTERVAL_METHODS:
+        raise ValueError(f"Método de intervalo desconhecido: {method} (esperado {INTERVAL_METHODS})")
+    if not 0 < confidence < 1:
+        raise ValueError(f"Nível de confiança inválido: {confidence} (esperado entre 0 e 1)")
+    return IntervalOptions(method=method, confidence=confidence, **bootstrap)
+
+
+def analytic_intervals(rcp: float, rcpk: float, n_obs: int, confidence: float = 0.95) -> CapabilityIntervals:
+    if n_obs < 2:
+        raise ValueError("São necessárias pelo menos 2 observações para o intervalo de confiança.")
+    alpha = 1 - confidence
+    dof = n_obs - 1
+    rcp_ci = (
+        float(rcp * np.sqrt(stats.chi2.ppf(alpha / 2, dof) / dof)),
+        float(rcp * np.sqrt(stats.chi2.ppf(1 - alpha / 2, dof) / dof))
+    )
+    spread = stats.norm.ppf(1 - alpha / 2) * np.sqrt(1 / (9 * n_obs) + rcpk ** 2 / (2 * dof))
+    return CapabilityIntervals("analytic", confidence, rcp_ci, (float(rcpk - spread), float(rcpk + spread)))
+
+
+def bootstrap_replicates(kind: str, data: dict, lse: float, lie: float, n_boot: int, seed=None, batch_size: int = 1000, max_workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Réplicas de (RCP, RCPk); cada lote tem semente própria derivada de `seed`,
+    # então o resultado não depende de max_workers
+    units = len(next(iter(data.values())))
+    batch_size = max(1, min(batch_size, _BATCH_ELEMENTS // max(units, 1)))
+    sizes = [min(batch_size, n_boot - start) for start in range(0, n_boot, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(kind, data, lse, lie, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+    if max_workers is not None and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            batches = list(executor.map(_bootstrap_batch, tasks))
+    else:
+        batches = [_bootstrap_batch(task) for task in tasks]
+    return np.concatenate([rcp for rcp, _ in batches]), np.concatenate([rcpk for _, rcpk in batches])
+
+
+def _bootstrap_batch(args):
+    kind, data, lse, lie, size, seed = args
+    rng = np.random.default_rng(seed)
+    units = len(next(iter(data.values())))
+    rows = rng.integers(0, units, size=(size, units))
+    if kind == "XR":
+        mean = data["means"][rows].mean(axis=1)
+        sigma = data["ranges"][rows].mean(axis=1) / data["d2"]
+    elif kind == "XS":
+        sizes = data["sizes"][rows]
+        mean = (data["means"] * data["sizes"])[rows].sum(axis=1) / sizes.sum(axis=1)
+        sigma = data["s_over_c4"][rows].mean(axis=1)
+    elif kind == "IMR":
+        values = data["values"][rows]
+        mean = values.mean(axis=1)
+        sigma = np.abs(np.diff(values, axis=1)).mean(axis=1) / data["d2"]
+    else:
+        values = data["values"][rows]
+        mean = values.mean(axis=1)
+        sigma = values.std(axis=1, ddof=1)
+    # Mesmas fórmulas de ProcessCapability; sigma nulo vira NaN (ignorado nos percentis)
+    sigma = np.where(sigma > 0, sigma, np.nan)
+    rcp = np.abs((lse - lie) / (6 * sigma))
+    rcpk = np.abs(np.minimum(lse - mean, mean - lie) / (3 * sigma))
+    return rcp, rcpk
+
+
+def bootstrap_data(instance, chart_type: str) -> dict:
+    # Estatísticas por unidade reamostrada (subgrupo ou medida individual) de cada gráfico
+    if chart_type == "XR":
+        subgroups = instance.subgroups
+        # Subgrupos de tamanhos diferentes vêm completados com NaN (ver XR_graph.normalize_data)
+        return {
+            "means": np.nanmean(subgroups, axis=1),
+            "ranges": np.nanmax(subgroups, axis=1) - np.nanmin(subgroups, axis=1),
+            "d2": instance.constants["d2"]
+        }
+    if chart_type == "XS":
+        sizes = instance.df["n"].to_numpy()
+        c4 = instance.df["LC_S"].to_numpy() / instance.sigma
+        return {
+            "means": instance.df["X_bar"].to_numpy(),
+            "sizes": sizes.astype(np.float64),
+            "s_over_c4": instance.df["S"].to_numpy() / c4
+        }
+    data = {"values": instance.df["Valor"].to_numpy(dtype=np.float64)}
+    if chart_type == "IMR":
+        data["d2"] = instance.constants_table[2]["d2"]
+    return data
+
+
+def total_observations(instance, chart_type: str) -> int:
+    if chart_type == "XR":
+        return int(np.count_nonzero(~np.isnan(instance.subgroups)))
+    if chart_type == "XS":
+        return int(instance.df["n"].sum())
+    return len(instance.df)
+
+
+def chart_intervals(instance, chart_type: str, rcp: Optional[float], rcpk: Optional[float]) -> Optional[CapabilityIntervals]:
+    # None se o gráfico não pediu intervalos (set_capability_intervals) ou sem índices calculados
+    options = getattr(instance, "capability_intervals", None)
+    if options is None or rcp is None or rcpk is None:
+        return None
+    if options.method == "analytic":
+        return analytic_intervals(rcp, rcpk, total_observations(instance, chart_type), options.confidence)
+    rcp_boot, rcpk_boot = bootstrap_replicates(
+        chart_type, bootstrap_data(instance, chart_type), instance.lse, instance.lie,
+        options.n_boot, options.seed, options.batch_size, options.max_workers
+    )
+    alpha = 1 - options.confidence
+    quantiles = [alpha / 2, 1 - alpha / 2]
+    return CapabilityIntervals(
+        "bootstrap",
+        options.confidence,
+        tuple(float(value) for value in np.nanquantile(rcp_boot, quantiles)),
+        tuple(float(value) for value in np.nanquantile(rcpk_boot, quantiles)),
+        n_boot=options.n_boot
+    )
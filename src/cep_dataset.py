@@ -0,0 +1,95 @@
+import os
+import json
+import glob
+import numpy as np
+
+
+# Formato binário colunar: um diretório "<nome>.cep" com header.json
+# (nomes das colunas, dtype, shape e tamanho do subgrupo) e um .npy por coluna,
+# aberto com mmap para evitar cópia e parsing de texto a cada execução.
+DATASET_FORMAT = "cep-columns"
+DATASET_VERSION = 1
+DATASET_EXTENSION = ".cep"
+HEADER_FILE = "header.json"
+
+
+def is_dataset(path) -> bool:
+    return os.path.isfile(os.path.join(path, HEADER_FILE))
+
+
+def write_dataset(columns: dict, path: str) -> str:
+    os.makedirs(path, exist_ok=True)
+    header = {
+        "format": DATASET_FORMAT,
+        "version": DATASET_VERSION,
+        "n_records": 0,
+        "subgroup_size": None,
+        "columns": []
+    }
+    for i, (name, values) in enumerate(columns.items()):
+        values = np.asarray(values)
+        if values.dtype == object:
+            # Colunas de texto (ex.: "Amostra") viram unicode de largura fixa para permitir mmap
+            values = values.astype(str)
+        file_name = f"col{i}.npy"
+        np.save(os.path.join(path, file_name), np.ascontiguousarray(values))
+        header["columns"].append({
+            "name": name,
+            "file": file_name,
+            "dtype": values.dtype.str,
+            "shape": list(values.shape)
+        })
+        header["n_records"] = int(values.shape[0])
+        if values.ndim == 2:
+            header["subgroup_size"] = int(values.shape[1])
+    with open(os.path.join(path, HEADER_FILE), 'w', encoding='utf-8') as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def read_header(path: str) -> dict:
+    with open(os.path.join(path, HEADER_FILE), 'r', encoding='utf-8') as f:
+        header = json.load(f)
+    if header.get("format") != DATASET_FORMAT:
+        raise ValueError(f"Erro ao ler {path}: formato '{header.get('format')}' não suportado")
+    if header.get("version", 0) > DATASET_VERSION:
+        raise ValueError(f"Erro ao ler {path}: versão {header['version']} mais nova que a suportada ({DATASET_VERSION})")
+    return header
+
+
+def load_dataset(path: str, mmap_mode: str = 'r') -> dict:
+    header = read_header(path)
+    columns = {}
+    for column in header["columns"]:
+        values = np.load(os.path.join(path, column["file"]), mmap_mode=mmap_mode, allow_pickle=False)
+        if list(values.shape) != column["shape"]:
+            raise ValueError(f"Erro ao ler {path}: coluna '{column['name']}' com shape {values.shape}, esperado {tuple(column['shape'])}")
+        columns[column["name"]] = values
+    return columns
+
+
+def json_to_dataset(json_url: str, path: str = None, chunk_size: int = 10000) -> str:
+    from AbstractCEP import AbstractControlChart
+    if path is None:
+        path = os.path.splitext(json_url)[0] + DATASET_EXTENSION
+    columns = AbstractControlChart.json_to_columns(json_url, chunk_size=chunk_size)
+    return write_dataset(columns, path)
+
+
+def convert_json_files(directory: str = "json_files", output_directory: str = None) -> list:
+    # Converte os arquivos de dados (listas de registros); dicionários como constantes_cep.json são ignorados
+    output_directory = output_directory or directory
+    converted = []
+    for json_url in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(json_url, 'r', encoding='utf-8') as f:
+            first_char = f.read(4096).lstrip()[:1]
+        if first_char != "[":
+            continue
+        name = os.path.splitext(os.path.basename(json_url))[0]
+        converted.append(json_to_dataset(json_url, os.path.join(output_directory, name + DATASET_EXTENSION)))
+        print(f"[INFO] {json_url} convertido para {converted[-1]}")
+    return converted
+
+
+if __name__ == "__main__":
+    convert_json_files()
@@ -0,0 +1,101 @@
+import io
+import base64
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    dpi: int = 300
+    tight: bool = True  # tight_layout + bbox_inches='tight'
+    backend: Optional[str] = None
+    reuse_figures: bool = False  # mantém figura/artistas e só atualiza os dados
+
+
+DEFAULT_RENDER = RenderProfile()
+FAST_RENDER = RenderProfile(dpi=100, tight=False, backend="Agg", reuse_figures=True)
+
+_default_profile = DEFAULT_RENDER
+_templates: Dict[str, dict] = {}
+
+
+def use_profile(profile: RenderProfile):
+    global _default_profile
+    _default_profile = profile
+    if profile.backend:
+        matplotlib.use(profile.backend)
+    if not profile.reuse_figures:
+        clear_templates()
+
+
+def resolve_profile(profile: Optional[RenderProfile]) -> RenderProfile:
+    return profile if profile is not None else _default_profile
+
+
+def get_template(key: str, builder: Callable[[], dict], profile: RenderProfile) -> dict:
+    # Com reuse_figures, a figura de cada tipo de gráfico é criada uma vez por processo
+    if profile.backend and matplotlib.get_backend().lower() != profile.backend.lower():
+        matplotlib.use(profile.backend)
+    if profile.reuse_figures and key in _templates:
+        return _templates[key]
+    template = builder()
+    if profile.reuse_figures:
+        _templates[key] = template
+    return template
+
+
+def save_figure(template: dict, output, profile: RenderProfile, image_format: str = None):
+    fig = template["fig"]
+    if profile.tight:
+        fig.tight_layout()
+        fig.savefig(output, dpi=profile.dpi, bbox_inches='tight', format=image_format)
+    else:
+        fig.savefig(output, dpi=profile.dpi, format=image_format)
+    if not profile.reuse_figures:
+        plt.close(fig)
+
+
+def render_png(template: dict, profile: RenderProfile, output_path: str = None) -> bytes:
+    # Renderiza em memória; o arquivo PNG só é escrito se output_path for informado
+    buffer = io.BytesIO()
+    save_figure(template, buffer, profile, image_format='png')
+    png = buffer.getvalue()
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(png)
+    return png
+
+
+def png_data_uri(png: bytes) -> str:
+    if not png:
+        return ""
+    return f"data:image/png;base64,{base64.b64encode(png).decode()}"
+
+
+def clear_templates():
+    for template in _templates.values():
+        plt.close(template["fig"])
+    _templates.clear()
+
+
+def set_x_range(ax, x):
+    # Equivalente ao autoscale padrão (margem de 5%) para eixos reaproveitados
+    if len(x) == 0:
+        return
+    x_min, x_max = float(min(x)), float(max(x))
+    margin = (x_max - x_min) * 0.05 or 0.5
+    ax.set_xlim(x_min - margin, x_max + margin)
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+
+
+def sample_positions(values):
+    # Rótulos de amostra ("1", "2", ...) como eixo numérico; se não forem números, usa 1..n
+    positions = pd.to_numeric(pd.Series(values), errors='coerce')
+    if positions.isna().any():
+        return np.arange(1, len(positions) + 1)
+    return positions.to_numpy()
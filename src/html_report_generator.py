@@ -1,8 +1,54 @@
+import io
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import base64
+import html_table
+
+
+# Linhas de tabela formatadas/escritas por bloco nos relatórios
+ROW_CHUNK_SIZE = 5000
+
+
+def format_fixed(values, decimals: int) -> np.ndarray:
+    return np.char.mod(f"%.{decimals}f", np.asarray(values, dtype=float)).astype(object)
+
+
+def as_text(values) -> np.ndarray:
+    return np.asarray(values).astype(str).astype(object)
+
+
+def join_rows(parts) -> str:
+    # Concatena, elemento a elemento, textos fixos e arrays (dtype object) de um bloco de linhas
+    rows = parts[0]
+    for part in parts[1:]:
+        rows = rows + part
+    return "".join(rows)
+
+
+# Segundo gráfico dos relatórios de subgrupos: (título, coluna, rótulo da coluna)
+_SUBGROUP_CHARTS = {
+    "XR": ("X-R", "R", "R (Range)"),
+    "XS": ("X-S", "S", "S (Desvio-padrão)"),
+    "IMR": ("I-MR", "MR", "MR (Amplitude Móvel)")
+}
+
+# Primeiro gráfico: (coluna de identificação, coluna, rótulo da coluna, símbolo, nome do gráfico)
+_FIRST_CHARTS = {
+    "IMR": ("Medida", "Valor", "X (Individual)", "X", "X")
+}
+_DEFAULT_FIRST_CHART = ("Amostra", "X_bar", "X̄ (Média)", "X̄", "X-barra")
+
+
+def _id_column(df: pd.DataFrame) -> str:
+    # Coluna de identificação das tabelas de medidas individuais (cabeçalho e valores)
+    return "Medida" if "Medida" in df.columns else "Amostra"
+
+
+def _row_background(index) -> np.ndarray:
+    return np.where(np.asarray(index) % 2 == 0, "bg-gray-50", "").astype(object)
 
 
 @dataclass
@@ -48,6 +94,10 @@ class CapabilityResult:
     centralization_pct: float
     is_centered: bool
     success_probability: float = 0.0
+    rcp_ci: Optional[Tuple[float, float]] = None
+    rcpk_ci: Optional[Tuple[float, float]] = None
+    interval_method: str = ""  # "analytic" ou "bootstrap" (ver capability_intervals)
+    interval_confidence: float = 0.0
 
 
 @dataclass
@@ -65,6 +115,8 @@ class XRReportData:
     process_info: ProcessInfo
     capability: Optional[CapabilityResult] = None
     image_base64: str = ""
+    chart_html: str = ""
+    table_mode: str = "full"  # "full" (todas as linhas em <tr>) ou "paged" (ver html_table)
 
 
 @dataclass
@@ -79,6 +131,8 @@ class XReportData:
     process_info: ProcessInfo
     capability: Optional[CapabilityResult] = None
     image_base64: str = ""
+    chart_html: str = ""
+    table_mode: str = "full"  # "full" (todas as linhas em <tr>) ou "paged" (ver html_table)
 
 
 class CEPReportGeneratorTailwind:
@@ -127,6 +181,8 @@ class CEPReportGeneratorTailwind:
         
         chart_description = {
             "XR": "Gráficos de Controle X-barra e R",
+            "XS": "Gráficos de Controle X-barra e S",
+            "IMR": "Gráficos de Controle I-MR (Medidas Individuais e Amplitude Móvel)",
             "X": "Gráficos de Controle X (Medidas Individuais)"
         }.get(chart_type, chart_type)
         
@@ -192,8 +248,15 @@ class CEPReportGeneratorTailwind:
 </div>
 """
     
-    def _render_chart_image(self, image_base64: str) -> str:
+    def _render_chart_image(self, image_base64: str, chart_html: str = "") -> str:
         
+        if chart_html:
+            return f"""
+<div class=\"mb-8\">
+    <h2 class=\"text-lg font-semibold mb-4\">Gráficos de Controle</h2>
+    {chart_html}
+</div>
+"""
         if not image_base64:
             return '<div class="p-4 mb-4 bg-yellow-50 border-l-4 border-yellow-400 text-yellow-700" role="alert">Imagem do gráfico não disponível</div>'
         
@@ -332,7 +395,7 @@ class CEPReportGeneratorTailwind:
                 <td class=\"py-2 px-4 border-b\">(μ - LIE) / (3σ)</td>
             </tr>
         </tbody>
-    </table>
+    </table>{self._render_capability_intervals(capability)}
     <div class=\"{cap_status_bg} {cap_status_border} p-4 rounded-lg mt-4\">\n        <h3 class=\"font-semibold {cap_status_text}\">Conclusão da Capacidade</h3>
         <p class=\"{cap_status_text} mb-2\"><strong>RCP:</strong> {capability.rcp_interpretation}</p>
         <p class=\"{cap_status_text} mb-2\"><strong>RCPk:</strong> {capability.rcpk_interpretation}</p>
@@ -346,103 +409,163 @@ class CEPReportGeneratorTailwind:
 </div>
 """
     
-    def _render_data_table_xr(self, df: pd.DataFrame, lsc_x: float, lic_x: float, lsc_r: float) -> str:
+    def _render_capability_intervals(self, capability: CapabilityResult) -> str:
+
+        if capability.rcp_ci is None or capability.rcpk_ci is None:
+            return ""
+        method = "Bootstrap (percentis)" if capability.interval_method == "bootstrap" else "Analítico (qui-quadrado / Bissell)"
+        rows = ""
+        for name, value, (lower, upper) in (
+            ("RCP", capability.rcp, capability.rcp_ci),
+            ("RCPk", capability.rcpk, capability.rcpk_ci)
+        ):
+            rows += f"""
+            <tr class=\"text-gray-700\">
+                <td class=\"py-2 px-4 border-b font-semibold\">{name}</td>
+                <td class=\"py-2 px-4 border-b font-mono\">{value:.4f}</td>
+                <td class=\"py-2 px-4 border-b font-mono\">{lower:.4f}</td>
+                <td class=\"py-2 px-4 border-b font-mono\">{upper:.4f}</td>
+            </tr>"""
+        return f"""
+    <h3 class=\"text-md font-semibold mt-4 mb-2\">Intervalos de Confiança ({capability.interval_confidence:.0%}) - {method}</h3>
+    <table class=\"min-w-full bg-white border rounded-lg overflow-hidden\">
+        <thead>
+            <tr class=\"text-gray-700 bg-gray-100\">
+                <th class=\"py-2 px-4 border-b\">Índice</th>
+                <th class=\"py-2 px-4 border-b\">Estimativa</th>
+                <th class=\"py-2 px-4 border-b\">Limite Inferior</th>
+                <th class=\"py-2 px-4 border-b\">Limite Superior</th>
+            </tr>
+        </thead>
+        <tbody>{rows}
+        </tbody>
+    </table>"""
+    
+    def _render_data_table_xr(self, df: pd.DataFrame, lsc_x: float, lic_x: float, lsc_r: float, x_out=None, r_out=None) -> str:
         
-        html = """
+        buffer = io.StringIO()
+        self._write_data_table_xr(buffer, df, lsc_x, lic_x, lsc_r, x_out, r_out)
+        return buffer.getvalue()
+    
+    def _write_data_table_xr(self, f, df: pd.DataFrame, lsc_x: float, lic_x: float, lsc_r: float, x_out=None, r_out=None):
+        # Linhas formatadas em blocos vetorizados e escritas direto no arquivo (memória limitada).
+        # x_out/r_out: máscaras já calculadas (ex.: limites por subgrupo no X̄-S); senão usa os limites
+        _, column, label = _SUBGROUP_CHARTS.get(self.chart_type, _SUBGROUP_CHARTS["XR"])
+        id_column, x_column, x_label, x_symbol, _ = _FIRST_CHARTS.get(self.chart_type, _DEFAULT_FIRST_CHART)
+        f.write(f"""
 <div class=\"mb-8\">
     <h2 class=\"text-lg font-semibold mb-4\">Dados Completos</h2>
     <div class=\"overflow-x-auto\">
         <table class=\"min-w-full bg-white border rounded-lg overflow-hidden\">
             <thead>
                 <tr class=\"text-gray-700 bg-gray-100\">
-                    <th class=\"py-2 px-4 border-b\">Amostra</th>
-                    <th class=\"py-2 px-4 border-b\">X̄ (Média)</th>
-                    <th class=\"py-2 px-4 border-b\">R (Range)</th>
-                    <th class=\"py-2 px-4 border-b\">Status X̄</th>
-                    <th class=\"py-2 px-4 border-b\">Status R</th>
+                    <th class=\"py-2 px-4 border-b\">{id_column}</th>
+                    <th class=\"py-2 px-4 border-b\">{x_label}</th>
+                    <th class=\"py-2 px-4 border-b\">{label}</th>
+                    <th class=\"py-2 px-4 border-b\">Status {x_symbol}</th>
+                    <th class=\"py-2 px-4 border-b\">Status {column}</th>
                 </tr>
             </thead>
             <tbody>
-"""
-        
-        for idx, row in df.iterrows():
-            x_out = row['X_bar'] > lsc_x or row['X_bar'] < lic_x
-            r_out = row['R'] > lsc_r
-            
-            x_status = "Fora" if x_out else "OK"
-            r_status = "Fora" if r_out else "OK"
-            
-            x_class = "bg-red-50 font-bold" if x_out else ""
-            r_class = "bg-red-50 font-bold" if r_out else ""
-            row_bg = "bg-gray-50" if idx % 2 == 0 else ""
-            
-            html += f"""
-                <tr style=\"{row_bg}\" class=\"text-gray-700\">
-                    <td class=\"py-2 px-4 border-b\">{row['Amostra']}</td>
-                    <td class=\"py-2 px-4 border-b font-mono {x_class}\">{row['X_bar']:.4f}</td>
-                    <td class=\"py-2 px-4 border-b font-mono {r_class}\">{row['R']:.4f}</td>
-                    <td class=\"py-2 px-4 border-b text-center\">{x_status}</td>
-                    <td class=\"py-2 px-4 border-b text-center\">{r_status}</td>
-                </tr>
-"""
-        
-        html += """
+""")
+        for start in range(0, len(df), ROW_CHUNK_SIZE):
+            chunk = df.iloc[start:start + ROW_CHUNK_SIZE]
+            x_bar = chunk[x_column].to_numpy(dtype=float)
+            r = chunk[column].to_numpy(dtype=float)
+            chunk_x_out = (x_bar > lsc_x) | (x_bar < lic_x) if x_out is None else x_out[start:start + ROW_CHUNK_SIZE]
+            chunk_r_out = r > lsc_r if r_out is None else r_out[start:start + ROW_CHUNK_SIZE]
+            f.write(join_rows([
+                '\n                <tr style="', _row_background(chunk.index), '" class="text-gray-700">\n',
+                '                    <td class="py-2 px-4 border-b">', as_text(chunk[id_column]), '</td>\n',
+                '                    <td class="py-2 px-4 border-b font-mono ', np.where(chunk_x_out, "bg-red-50 font-bold", "").astype(object), '">', format_fixed(x_bar, 4), '</td>\n',
+                '                    <td class="py-2 px-4 border-b font-mono ', np.where(chunk_r_out, "bg-red-50 font-bold", "").astype(object), '">', format_fixed(r, 4), '</td>\n',
+                '                    <td class="py-2 px-4 border-b text-center">', np.where(chunk_x_out, "Fora", "OK").astype(object), '</td>\n',
+                '                    <td class="py-2 px-4 border-b text-center">', np.where(chunk_r_out, "Fora", "OK").astype(object), '</td>\n',
+                '                </tr>\n'
+            ]))
+        f.write("""
             </tbody>
         </table>
     </div>
 </div>
-"""
-        return html
+""")
     
     def _render_data_table_x(self, df: pd.DataFrame, lsc_x: float, lic_x: float) -> str:
        
-        id_column = "Medida" if "Medida" in df.columns else "Amostra"
+        buffer = io.StringIO()
+        self._write_data_table_x(buffer, df, lsc_x, lic_x)
+        return buffer.getvalue()
+    
+    def _write_data_table_x(self, f, df: pd.DataFrame, lsc_x: float, lic_x: float):
+       
+        id_column = _id_column(df)
         
-        html = """
+        f.write(f"""
 <div class=\"mb-8\">
     <h2 class=\"text-lg font-semibold mb-4\">Dados Completos</h2>
     <div class=\"overflow-x-auto\">
         <table class=\"min-w-full bg-white border rounded-lg overflow-hidden\">
             <thead>
                 <tr class=\"text-gray-700 bg-gray-100\">
-                    <th class=\"py-2 px-4 border-b\">Medida</th>
+                    <th class=\"py-2 px-4 border-b\">{id_column}</th>
                     <th class=\"py-2 px-4 border-b\">Valor</th>
                     <th class=\"py-2 px-4 border-b\">Status</th>
                 </tr>
             </thead>
             <tbody>
-"""
-        
-        for idx, row in df.iterrows():
-            x_out = row['Valor'] > lsc_x or row['Valor'] < lic_x
-            status = "Fora" if x_out else "OK"
-            x_class = "bg-red-50 font-bold" if x_out else ""
-            row_bg = "bg-gray-50" if idx % 2 == 0 else ""
-            id_value = row[id_column]
-            
-            html += f"""
-                <tr style=\"{row_bg}\" class=\"text-gray-700\">
-                    <td class=\"py-2 px-4 border-b\">{id_value}</td>
-                    <td class=\"py-2 px-4 border-b font-mono {x_class}\">{row['Valor']:.4f}</td>
-                    <td class=\"py-2 px-4 border-b text-center\">{status}</td>
-                </tr>
-"""
-        
-        html += """
+""")
+        for start in range(0, len(df), ROW_CHUNK_SIZE):
+            chunk = df.iloc[start:start + ROW_CHUNK_SIZE]
+            values = chunk['Valor'].to_numpy(dtype=float)
+            x_out = (values > lsc_x) | (values < lic_x)
+            f.write(join_rows([
+                '\n                <tr style="', _row_background(chunk.index), '" class="text-gray-700">\n',
+                '                    <td class="py-2 px-4 border-b">', as_text(chunk[id_column]), '</td>\n',
+                '                    <td class="py-2 px-4 border-b font-mono ', np.where(x_out, "bg-red-50 font-bold", "").astype(object), '">', format_fixed(values, 4), '</td>\n',
+                '                    <td class="py-2 px-4 border-b text-center">', np.where(x_out, "Fora", "OK").astype(object), '</td>\n',
+                '                </tr>\n'
+            ]))
+        f.write("""
             </tbody>
         </table>
     </div>
 </div>
-"""
-        return html
+""")
+    
+    def _render_paged_table_xr(self, df: pd.DataFrame, lsc_x: float, lic_x: float, lsc_r: float, x_out=None, r_out=None) -> str:
+        
+        _, column, label = _SUBGROUP_CHARTS.get(self.chart_type, _SUBGROUP_CHARTS["XR"])
+        id_column, x_column, x_label, x_symbol, _ = _FIRST_CHARTS.get(self.chart_type, _DEFAULT_FIRST_CHART)
+        x_bar = df[x_column].to_numpy(dtype=float)
+        r = df[column].to_numpy(dtype=float)
+        spec = html_table.table(len(df))
+        html_table.add_column(spec, id_column, df[id_column])
+        x_col = html_table.add_column(spec, x_label, x_bar, decimals=4, mono=True, out=(x_bar > lsc_x) | (x_bar < lic_x) if x_out is None else x_out)
+        r_col = html_table.add_column(spec, label, r, decimals=4, mono=True, out=r > lsc_r if r_out is None else r_out)
+        html_table.add_status_column(spec, f"Status {x_symbol}", x_col)
+        html_table.add_status_column(spec, f"Status {column}", r_col)
+        return html_table.render_table_html(spec, f"cep-table-{self.chart_type.lower()}")
+    
+    def _render_paged_table_x(self, df: pd.DataFrame, lsc_x: float, lic_x: float) -> str:
+        
+        id_column = _id_column(df)
+        values = df['Valor'].to_numpy(dtype=float)
+        spec = html_table.table(len(df))
+        html_table.add_column(spec, id_column, df[id_column])
+        x_col = html_table.add_column(spec, "Valor", values, decimals=4, mono=True, out=(values > lsc_x) | (values < lic_x))
+        html_table.add_status_column(spec, "Status", x_col)
+        return html_table.render_table_html(spec, "cep-table-x")
     
     def generate_xr_report(self, data: XRReportData, output_file: str = "relatorio_cep_xr.html") -> str:
         
-        html = self._get_html_head("Relatório CEP - Gráficos X-R")
+        chart_type = self.chart_type if self.chart_type in _SUBGROUP_CHARTS else "XR"
+        title, column, _ = _SUBGROUP_CHARTS[chart_type]
+        x_name = _FIRST_CHARTS.get(chart_type, _DEFAULT_FIRST_CHART)[4]
+        html = self._get_html_head(f"Relatório CEP - Gráficos {title}")
         html += '<div class="container">\n'
         
         # Header
-        html += self._render_header("XR")
+        html += self._render_header(chart_type)
         
         # Process Info
         html += self._render_process_info(data.process_info)
@@ -450,12 +573,12 @@ class CEPReportGeneratorTailwind:
         # Control Limits
         html += '<div class="mb-8">\n'
         html += '<h2 class="text-lg font-semibold mb-4">Limites de Controle</h2>\n'
-        html += self._render_control_limits(data.x_control_limits, "Gráfico X-barra")
-        html += self._render_control_limits(data.r_control_limits, "Gráfico R")
+        html += self._render_control_limits(data.x_control_limits, f"Gráfico {x_name}")
+        html += self._render_control_limits(data.r_control_limits, f"Gráfico {column}")
         html += '</div>\n'
         
         # Chart Image
-        html += self._render_chart_image(data.image_base64)
+        html += self._render_chart_image(data.image_base64, data.chart_html)
         
         # Western Electric Rules (shows process state banner inside)
         html += '<div class="mb-8">\n'
@@ -469,17 +592,21 @@ class CEPReportGeneratorTailwind:
             html += self._render_capability_analysis(data.capability)
         
         # Data Table
-        html += self._render_data_table_xr(
-            data.df,
-            data.x_control_limits.upper_control_limit,
-            data.x_control_limits.lower_control_limit,
-            data.r_control_limits.upper_control_limit
-        )
-        
-        html += self._get_html_footer()
-        
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
+            table_args = (
+                data.df,
+                data.x_control_limits.upper_control_limit,
+                data.x_control_limits.lower_control_limit,
+                data.r_control_limits.upper_control_limit,
+                data.df.index.isin(data.out_of_control_x.index),
+                data.df.index.isin(data.out_of_control_r.index)
+            )
+            if data.table_mode == "paged":
+                f.write(self._render_paged_table_xr(*table_args))
+            else:
+                self._write_data_table_xr(f, *table_args)
+            f.write(self._get_html_footer())
         
         print(f"[INFO] Relatório HTML gerado: {output_file}")
         return output_file
@@ -502,7 +629,7 @@ class CEPReportGeneratorTailwind:
         html += '</div>\n'
         
         
-        html += self._render_chart_image(data.image_base64)
+        html += self._render_chart_image(data.image_base64, data.chart_html)
         
         
         html += '<div class="mb-8">\n'
@@ -515,16 +642,18 @@ class CEPReportGeneratorTailwind:
             html += self._render_capability_analysis(data.capability)
         
         
-        html += self._render_data_table_x(
-            data.df,
-            data.x_control_limits.upper_control_limit,
-            data.x_control_limits.lower_control_limit
-        )
-        
-        html += self._get_html_footer()
-        
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
+            table_args = (
+                data.df,
+                data.x_control_limits.upper_control_limit,
+                data.x_control_limits.lower_control_limit
+            )
+            if data.table_mode == "paged":
+                f.write(self._render_paged_table_x(*table_args))
+            else:
+                self._write_data_table_x(f, *table_args)
+            f.write(self._get_html_footer())
         
         print(f"[INFO] Relatório HTML gerado: {output_file}")
         return output_file
@@ -0,0 +1,131 @@
+import json
+import math
+import numpy as np
+
+
+# Tabela de dados paginada: o HTML leva as colunas em JSON compacto e um
+# renderizador inline monta só a página visível no navegador.
+# As linhas fora de controle são pré-indexadas (índices ordenados por coluna e
+# a união em "rows_out") para navegação direta entre elas.
+# Estrutura da especificação:
+#   {"n_rows", "page_size", "rows_out": [índices],
+#    "columns": [{"label", "values": [...], "decimals", "mono", "out": [índices], "status"}]}
+
+PAGE_SIZE = 50
+
+
+def table(n_rows: int, page_size: int = PAGE_SIZE) -> dict:
+    return {"n_rows": int(n_rows), "page_size": int(page_size), "rows_out": [], "columns": []}
+
+
+def add_column(target: dict, label: str, values, decimals: int = None, mono: bool = False, out=None) -> int:
+    # Com decimals, os valores vão como números arredondados e são formatados no navegador
+    if decimals is None:
+        values = np.asarray(values).astype(str).tolist()
+    else:
+        values = [v if math.isfinite(v) else None for v in np.round(np.asarray(values, dtype=float), decimals).tolist()]
+    column = {"label": label, "values": values, "decimals": decimals, "mono": mono, "out": [], "status": None}
+    if out is not None:
+        column["out"] = np.flatnonzero(np.asarray(out, dtype=bool)).tolist()
+        target["rows_out"] = np.union1d(target["rows_out"], column["out"]).astype(int).tolist()
+    target["columns"].append(column)
+    return len(target["columns"]) - 1
+
+
+def add_status_column(target: dict, label: str, source: int):
+    # "Fora"/"OK" derivado dos índices fora de controle da coluna source
+    target["columns"].append({"label": label, "values": None, "decimals": None, "mono": False, "out": [], "status": source})
+
+
+def render_table_html(spec: dict, table_id: str = "cep-table", title: str = "Dados Completos") -> str:
+    data = json.dumps(spec, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    return f"""
+<div class=\"mb-8\">
+    <h2 class=\"text-lg font-semibold mb-4\">{title}</h2>
+    <div id=\"{table_id}\" class=\"overflow-x-auto\"></div>
+    <script type=\"application/json\" id=\"{table_id}-data\">{data}</script>
+    <script>{_RENDERER_JS}cepDrawTable(\"{table_id}\");</script>
+</div>
+"""
+
+
+_RENDERER_JS = """
+if (typeof cepDrawTable === "undefined") {
+var cepDrawTable = function (id) {
+  var spec = JSON.parse(document.getElementById(id + "-data").textContent);
+  var root = document.getElementById(id), cols = spec.columns, size = spec.page_size;
+  var rowsOut = spec.rows_out, outSets = cols.map(function (c) {
+    var s = {}; c.out.forEach(function (i) { s[i] = true; }); return s;
+  });
+  var state = {page: 0, onlyOut: false, focus: -1};
+  var btn = "px-3 py-1 border rounded bg-gray-100 hover:bg-gray-200";
+  root.innerHTML =
+    '<div class="flex flex-wrap items-center gap-2 mb-2 text-sm">' +
+    '<button id="' + id + '-first" class="' + btn + '">&laquo;</button>' +
+    '<button id="' + id + '-prev" class="' + btn + '">&lsaquo; Anterior</button>' +
+    '<span>Página <input id="' + id + '-page" type="number" min="1" class="w-20 border rounded px-1"> de <span id="' + id + '-pages"></span></span>' +
+    '<button id="' + id + '-next" class="' + btn + '">Próxima &rsaquo;</button>' +
+    '<button id="' + id + '-last" class="' + btn + '">&raquo;</button>' +
+    '<button id="' + id + '-out-prev" class="' + btn + ' text-red-700">&lsaquo; Fora de controle</button>' +
+    '<button id="' + id + '-out-next" class="' + btn + ' text-red-700">Fora de controle &rsaquo;</button>' +
+    '<label><input id="' + id + '-only" type="checkbox"> Somente fora de controle (' + rowsOut.length + ')</label>' +
+    '<span id="' + id + '-info" class="text-gray-600"></span></div>' +
+    '<table class="min-w-full bg-white border rounded-lg overflow-hidden"><thead><tr class="text-gray-700 bg-gray-100">' +
+    cols.map(function (c) { return '<th class="py-2 px-4 border-b">' + esc(c.label) + '</th>'; }).join("") +
+    '</tr></thead><tbody id="' + id + '-body"></tbody></table>';
+  function $(suffix) { return document.getElementById(id + "-" + suffix); }
+  function esc(v) { return String(v).replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;"); }
+  function total() { return state.onlyOut ? rowsOut.length : spec.n_rows; }
+  function pages() { return Math.max(1, Math.ceil(total() / size)); }
+  function lowerBound(arr, x) {
+    var lo = 0, hi = arr.length;
+    while (lo < hi) { var mid = (lo + hi) >> 1; if (arr[mid] < x) lo = mid + 1; else hi = mid; }
+    return lo;
+  }
+  function cell(c, j, i) {
+    if (c.status !== null) {
+      return '<td class="py-2 px-4 border-b text-center">' + (outSets[c.status][i] ? "Fora" : "OK") + '</td>';
+    }
+    var v = c.values[i], cls = "py-2 px-4 border-b" + (c.mono ? " font-mono" : "") + (outSets[j][i] ? " bg-red-50 font-bold" : "");
+    var text = v === null ? "nan" : (c.decimals !== null ? v.toFixed(c.decimals) : esc(v));
+    return '<td class="' + cls + '">' + text + '</td>';
+  }
+  function render() {
+    state.page = Math.min(Math.max(state.page, 0), pages() - 1);
+    var start = state.page * size, end = Math.min(start + size, total()), html = [];
+    for (var k = start; k < end; k++) {
+      var i = state.onlyOut ? rowsOut[k] : k;
+      var cls = "text-gray-700" + (i % 2 === 0 ? " bg-gray-50" : "") + (i === state.focus ? " ring-2 ring-red-400" : "");
+      html.push('<tr class="' + cls + '">' + cols.map(function (c, j) { return cell(c, j, i); }).join("") + '</tr>');
+    }
+    $("body").innerHTML = html.join("");
+    $("page").value = state.page + 1;
+    $("pages").textContent = pages();
+    $("info").textContent = total() ? "Linhas " + (start + 1) + "–" + end + " de " + total() : "Nenhuma linha";
+  }
+  function goTo(page) { state.page = page; render(); }
+  function jump(forward) {
+    // Próxima/anterior linha fora de controle a partir da linha em foco (ou da página atual)
+    if (!rowsOut.length) return;
+    var ref = state.focus >= 0 ? state.focus : (state.onlyOut ? rowsOut[state.page * size] : state.page * size) - (forward ? 1 : 0);
+    var k = forward ? lowerBound(rowsOut, ref + 1) : lowerBound(rowsOut, ref) - 1;
+    k = (k + rowsOut.length) % rowsOut.length;
+    state.focus = rowsOut[k];
+    goTo(Math.floor((state.onlyOut ? k : state.focus) / size));
+  }
+  $("first").onclick = function () { goTo(0); };
+  $("prev").onclick = function () { goTo(state.page - 1); };
+  $("next").onclick = function () { goTo(state.page + 1); };
+  $("last").onclick = function () { goTo(pages() - 1); };
+  $("page").onchange = function () { goTo((parseInt(this.value, 10) || 1) - 1); };
+  $("out-prev").onclick = function () { jump(false); };
+  $("out-next").onclick = function () { jump(true); };
+  $("only").onchange = function () {
+    state.onlyOut = this.checked;
+    var i = state.focus >= 0 ? state.focus : (state.onlyOut ? state.page * size : rowsOut[state.page * size] || 0);
+    goTo(Math.floor((state.onlyOut ? lowerBound(rowsOut, i) : i) / size));
+  };
+  render();
+};
+}
+"""
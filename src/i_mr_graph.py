@@ -0,0 +1,177 @@
+from typing import Dict, List, Tuple
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import chart_rendering
+import svg_chart
+import western_electric_rules as wer
+from x_graph import X_graph
+
+
+class IMR_graph(X_graph):
+    # Gráficos I-MR (medidas individuais e amplitude móvel): sigma estimado por MR̄/d2 (n = 2),
+    # robusto a deriva lenta do processo, ao contrário do desvio-padrão global do X_graph.
+    #   X: X̄ ± 3·MR̄/d2      MR: LC = MR̄, LSC = D4·MR̄, LIC = D3·MR̄
+    # Valores e amplitudes ficam em buffers que crescem por dobra; push() atualiza somas,
+    # limites e os monitores Western Electric em O(1), sem reprocessar o histórico.
+    chart_type = "IMR"
+    analyzer_names = ("analyzer_x", "analyzer_mr")
+    mr_mean: float
+    lsc_mr_graph: float
+    lic_mr_graph: float
+
+    def __init__(self, data_url="json_files/dados_individuais.json", constants_url="json_files/constantes_cep.json", streaming=False, compute_only=False, output_png='grafico_controle_imr.png', output_html='relatorio_cep_imr.html', render_profile=None, chart_format="png", table_mode="full", fixed_limits=False):
+        # fixed_limits=True mantém os limites da base histórica ao receber novos pontos (fase II)
+        self.fixed_limits = fixed_limits
+        super().__init__(data_url, constants_url, streaming=streaming, compute_only=compute_only, output_png=output_png, output_html=output_html, render_profile=render_profile, chart_format=chart_format, table_mode=table_mode)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        # Montado sob demanda (gráfico, análise, relatório) e reaproveitado até o próximo push
+        if self._df is None:
+            count = self._count
+            self._df = pd.DataFrame({"Medida": self._ids, "Valor": self._values[:count], "MR": self._mr[:count]})
+        return self._df
+
+    def normalize_data(self):
+        frame = self.data if isinstance(self.data, dict) else pd.DataFrame(self.data)
+        values = np.asarray(frame["Valor"], dtype=np.float64)
+        if len(values) < 2:
+            raise ValueError("O gráfico I-MR requer pelo menos 2 medidas individuais.")
+        count = len(values)
+        self._values = np.empty(max(2 * count, 1024))
+        self._mr = np.empty_like(self._values)
+        self._values[:count] = values
+        self._mr[0] = np.nan
+        self._mr[1:count] = np.abs(np.diff(values))
+        self._ids = list(frame["Medida"]) if "Medida" in frame else list(range(1, count + 1))
+        self._count = count
+        self._sum = float(values.sum())
+        self._mr_sum = float(self._mr[1:count].sum())
+        self._df = None
+        print("DataFrame de medidas individuais (I-MR):")
+        print(self.df)
+        self.calculate_internal_metrics()
+
+    def calculate_internal_metrics(self):
+        self.update_limits()
+        # Monitores aquecidos com o histórico; a partir daqui cada push() custa O(1)
+        self.monitor_x = wer.WesternElectricMonitor(self.x_mean, self.lsc_x_graph, self.lic_x_graph, "Gráfico X (Medidas Individuais)")
+        self.monitor_mr = wer.WesternElectricMonitor(self.mr_mean, self.lsc_mr_graph, self.lic_mr_graph, "Gráfico MR (Amplitude Móvel)")
+        self.monitor_x.push_many(self._values[:self._count])
+        self.monitor_mr.push_many(self._mr[:self._count])
+        print(f"X_BAR (média): {self.x_mean}")
+        print(f"MR_BAR: {self.mr_mean}")
+        print(f"SIGMA (MR/d2): {self.sigma}")
+        print(f"LIC (X): {self.lic_x_graph}")
+        print(f"LC (X): {self.x_mean}")
+        print(f"LSC (X): {self.lsc_x_graph}")
+        print(f"LIC (MR): {self.lic_mr_graph}")
+        print(f"LC (MR): {self.mr_mean}")
+        print(f"LSC (MR): {self.lsc_mr_graph}")
+        if not self.compute_only and self.chart_format == "png":
+            self.plot_control_charts()
+
+    def update_limits(self):
+        # O(1): apenas as somas acumuladas e as constantes de n = 2
+        constants = self.constants_table[2]
+        self.x_mean = self._sum / self._count
+        self.mr_mean = self._mr_sum / (self._count - 1)
+        self.sigma = self.mr_mean / constants["d2"]
+        self.lsc_x_graph = self.x_mean + (3 * self.sigma)
+        self.lic_x_graph = self.x_mean - (3 * self.sigma)
+        self.lsc_mr_graph = constants["D4"] * self.mr_mean
+        self.lic_mr_graph = constants["D3"] * self.mr_mean
+        self.analysis = None
+
+    def push(self, value: float, measure_id=None) -> Tuple[List[Dict], List[Dict]]:
+        # Novo ponto: devolve as violações Western Electric que ele gerou (X, MR)
+        value = float(value)
+        count = self._count
+        if count == len(self._values):
+            self._values = np.concatenate([self._values, np.empty(count)])
+            self._mr = np.concatenate([self._mr, np.empty(count)])
+        moving_range = abs(value - self._values[count - 1])
+        self._values[count] = value
+        self._mr[count] = moving_range
+        self._ids.append(measure_id if measure_id is not None else count + 1)
+        self._count = count + 1
+        self._sum += value
+        self._mr_sum += moving_range
+        self._df = None
+        if self.fixed_limits:
+            self.analysis = None
+        else:
+            self.update_limits()
+            self.monitor_x.set_limits(self.x_mean, self.lsc_x_graph, self.lic_x_graph)
+            self.monitor_mr.set_limits(self.mr_mean, self.lsc_mr_graph, self.lic_mr_graph)
+        return self.monitor_x.push(value), self.monitor_mr.push(moving_range)
+
+    def extend(self, values, measure_ids=None) -> Tuple[List[Dict], List[Dict]]:
+        x_violations, mr_violations = [], []
+        ids = measure_ids if measure_ids is not None else [None] * len(values)
+        for value, measure_id in zip(values, ids):
+            new_x, new_mr = self.push(value, measure_id)
+            x_violations.extend(new_x)
+            mr_violations.extend(new_mr)
+        return x_violations, mr_violations
+
+    @staticmethod
+    def _build_figure():
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
+        template = {"fig": fig, "ax1": ax1, "ax2": ax2}
+        template["x"], = ax1.plot([], [], 'bo-', linewidth=2, markersize=6, label='X (Medidas Individuais)')
+        template["x_lc"] = ax1.axhline(y=0, color='green', linestyle='-', linewidth=2)
+        template["x_lsc"] = ax1.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["x_lic"] = ax1.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["x_out"] = ax1.scatter(np.empty(0), np.empty(0), color='red', s=100, marker='o', facecolors='none', edgecolors='red', linewidth=3)
+        ax1.set_title('Gráfico de Controle I-MR (Medidas Individuais)', fontsize=14, fontweight='bold', pad=20)
+        ax1.set_ylabel('Valor (X)', fontsize=12)
+        ax1.grid(True, alpha=0.3)
+        template["mr"], = ax2.plot([], [], 'ro-', linewidth=2, markersize=6, label='MR (Amplitude Móvel)')
+        template["mr_lc"] = ax2.axhline(y=0, color='green', linestyle='-', linewidth=2)
+        template["mr_lsc"] = ax2.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["mr_lic"] = ax2.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["mr_out"] = ax2.scatter(np.empty(0), np.empty(0), color='red', s=100, marker='o', facecolors='none', edgecolors='red', linewidth=3)
+        ax2.set_xlabel('Número da Medida', fontsize=12)
+        ax2.set_ylabel('MR', fontsize=12)
+        ax2.grid(True, alpha=0.3)
+        plt.subplots_adjust(hspace=0.3)
+        return template
+
+    def _mr_range(self):
+        mr = self.df['MR']
+        mr_max = max(mr.max(), self.lsc_mr_graph)
+        return 0, mr_max * 1.15
+
+    def _mr_out_of_control_mask(self):
+        return ((self.df['MR'] > self.lsc_mr_graph) | (self.df['MR'] < self.lic_mr_graph)).to_numpy()
+
+    def _update_figure(self, template):
+        ax1, ax2 = template["ax1"], template["ax2"]
+        measures = chart_rendering.sample_positions(self.df['Medida'])
+        for axis, key, values, lines, out_of_control, y_range in (
+            (ax1, "x", self.df['Valor'].to_numpy(), ((self.x_mean, 'LC'), (self.lsc_x_graph, 'LSC'), (self.lic_x_graph, 'LIC')), self._out_of_control_mask(), self._y_range()),
+            (ax2, "mr", self.df['MR'].to_numpy(), ((self.mr_mean, 'LC'), (self.lsc_mr_graph, 'LSC'), (self.lic_mr_graph, 'LIC')), self._mr_out_of_control_mask(), self._mr_range()),
+        ):
+            template[key].set_data(measures, values)
+            for (value, label), suffix in zip(lines, ("_lc", "_lsc", "_lic")):
+                template[key + suffix].set_ydata([value, value])
+                template[key + suffix].set_label(f'{label} = {value:.4f}')
+            axis.legend(handles=[template[key + suffix] for suffix in ("", "_lc", "_lsc", "_lic")], loc='upper right', fontsize=10)
+            axis.set_ylim(*y_range)
+            chart_rendering.set_x_range(axis, measures)
+            template[key + "_out"].set_offsets(np.column_stack([measures[out_of_control], values[out_of_control]]))
+
+    def chart_spec(self):
+        spec = super().chart_spec()
+        x_panel = spec["panels"][0]
+        x_panel["title"] = 'Gráfico de Controle I-MR (Medidas Individuais)'
+        measures = chart_rendering.sample_positions(self.df['Medida'])
+        mr_panel = svg_chart.panel(measures, xlabel='Número da Medida', ylabel='MR', ylim=self._mr_range())
+        svg_chart.add_series(mr_panel, self.df['MR'], 'MR (Amplitude Móvel)', 'red')
+        svg_chart.add_hline(mr_panel, self.mr_mean, f'LC = {self.mr_mean:.4f}', 'green')
+        svg_chart.add_hline(mr_panel, self.lsc_mr_graph, f'LSC = {self.lsc_mr_graph:.4f}', 'red', dash=True)
+        svg_chart.add_hline(mr_panel, self.lic_mr_graph, f'LIC = {self.lic_mr_graph:.4f}', 'red', dash=True)
+        mr_panel["highlight"] = np.flatnonzero(self._mr_out_of_control_mask()).tolist()
+        return {"panels": [x_panel, mr_panel]}
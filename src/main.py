@@ -3,6 +3,7 @@ from x_graph import X_graph
 from attributes_charts import PChart, UChart
 from process_capability import calculate_capability
 from CEP_Problems import CEP_Problems
+import numpy as np
 if __name__ == "__main__":
     
     LSE_XR = 4.94
@@ -43,7 +44,14 @@ if __name__ == "__main__":
         n=9, 
         k_lim=3, 
         N=10, 
-        minimo_aceitos=8
+        minimo_aceitos=8,
+        curva_oc=CEP_Problems.curva_oc(
+            deslocamentos=np.linspace(0, 3, 61),
+            n_values=[1, 4, 9],
+            k_lim=3,
+            N=10,
+            minimo_aceitos=8
+        )
     )
     
     with open('relatorio_problemas_cep.html', 'w', encoding='utf-8') as f:
@@ -1,5 +1,9 @@
 
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
 from scipy import stats
+from scipy.special import ndtr
 
 
 class ProcessCapability:
@@ -17,6 +21,8 @@ class ProcessCapability:
         self.rcps = None  
         self.rcpi = None  
         self.process_mean = None
+        self.rcp_ci = None
+        self.rcpk_ci = None
         
     def set_process_mean(self, mean):
 
@@ -74,6 +80,18 @@ class ProcessCapability:
             'lie': self.lie
         }
     
+    def calculate_intervals(self, n_obs, confidence=0.95):
+        # Intervalos analíticos (qui-quadrado / Bissell) para os índices já calculados;
+        # o bootstrap sobre os subgrupos fica em capability_intervals (set_capability_intervals dos gráficos)
+        if self.rcp is None or self.rcpk is None:
+            print("[WARNING]: RCP/RCPk não calculados. Não é possível calcular os intervalos.")
+            return None
+        import capability_intervals
+        intervals = capability_intervals.analytic_intervals(self.rcp, self.rcpk, n_obs, confidence)
+        self.rcp_ci = intervals.rcp
+        self.rcpk_ci = intervals.rcpk
+        return intervals
+
     def interpret_rcp(self):
 
         if self.rcp is None:
@@ -181,3 +199,137 @@ def calculate_capability_x(x_instance, lse, lie, target=None):
     
     
     return capability
+
+
+# Quantis do método dos percentis: equivalem a μ ± 3σ quando os dados são normais
+PERCENTILE_LOW = 0.00135
+PERCENTILE_HIGH = 0.99865
+
+
+class PercentileCapability(ProcessCapability):
+    # Capacidade sem supor normalidade: 6σ vira a faixa entre os quantis 0,135% e 99,865%
+    # e a média vira a mediana, lidos de um QuantileSketch (quantile_sketch). O rendimento
+    # vem da distribuição empírica do sketch em vez da normal.
+
+    def __init__(self, sketch, lse=None, lie=None, target=None):
+
+        self.sketch = sketch
+        self.lower_quantile, self.median, self.upper_quantile = (
+            float(value) for value in sketch.quantile([PERCENTILE_LOW, 0.5, PERCENTILE_HIGH])
+        )
+        # sigma equivalente, mantém compatíveis os relatórios e calculate_intervals
+        super().__init__((self.upper_quantile - self.lower_quantile) / 6, lse, lie, target)
+        self.set_process_mean(self.median)
+
+    def calculate_rcpk(self):
+
+        if self.lse is None or self.lie is None:
+            print("[WARNING]: LSE e LIE não definidos. Não é possível calcular RCPk.")
+            return None
+
+        upper_spread = self.upper_quantile - self.median
+        lower_spread = self.median - self.lower_quantile
+        if upper_spread <= 0 or lower_spread <= 0:
+            print("[WARNING]: Dispersão nula entre os quantis. Não é possível calcular RCPk.")
+            return None
+
+        self.rcps = (self.lse - self.median) / upper_spread
+        self.rcpi = (self.median - self.lie) / lower_spread
+        self.rcpk = abs(min(self.rcps, self.rcpi))
+
+        return self.rcpk
+
+    def calculate_all(self):
+
+        result = super().calculate_all()
+        result.update({
+            'median': self.median,
+            'p_lower': self.lower_quantile,
+            'p_upper': self.upper_quantile
+        })
+        return result
+
+    def calculate_success_probability(self):
+
+        if self.lse is None or self.lie is None:
+            return None
+
+        inside = self.sketch.cdf(self.lse) - self.sketch.cdf(self.lie)
+        return float(inside) * 100
+
+
+def calculate_capability_percentile(source, lse, lie, target=None, compression=None):
+    # source: QuantileSketch, caminho(s) de sketches salvos (combinados com merge_sketches)
+    # ou array de medições
+    import quantile_sketch
+    if isinstance(source, quantile_sketch.QuantileSketch):
+        sketch = source
+    elif isinstance(source, str) or (isinstance(source, (list, tuple)) and source and isinstance(source[0], (str, quantile_sketch.QuantileSketch))):
+        sketch = quantile_sketch.merge_sketches([source] if isinstance(source, str) else source, compression)
+    else:
+        sketch = quantile_sketch.QuantileSketch(compression or quantile_sketch.DEFAULT_COMPRESSION).update(source)
+
+    capability = PercentileCapability(sketch, lse=lse, lie=lie, target=target)
+    capability.calculate_all()
+
+    return capability
+
+
+@dataclass(frozen=True)
+class CapabilityBatchResult:
+    # Arrays por característica (shape comum do broadcasting das entradas); NaN onde o
+    # índice não é calculável (sigma ≤ 0 ou não finito, média ou limite ausente)
+    process_mean: np.ndarray
+    sigma: np.ndarray
+    lse: np.ndarray
+    lie: np.ndarray
+    rcp: np.ndarray
+    rcpk: np.ndarray
+    rcps: np.ndarray
+    rcpi: np.ndarray
+    ppm: np.ndarray  # partes por milhão fora da especificação (normal)
+    success_probability: np.ndarray  # % dentro da especificação, como calculate_success_probability
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "media": np.ravel(self.process_mean),
+            "sigma": np.ravel(self.sigma),
+            "LSE": np.ravel(self.lse),
+            "LIE": np.ravel(self.lie),
+            "RCP": np.ravel(self.rcp),
+            "RCPk": np.ravel(self.rcpk),
+            "RCPs": np.ravel(self.rcps),
+            "RCPi": np.ravel(self.rcpi),
+            "ppm": np.ravel(self.ppm),
+            "rendimento_pct": np.ravel(self.success_probability)
+        })
+
+
+def calculate_capability_batch(means, sigmas, lse, lie) -> CapabilityBatchResult:
+    # Versão vetorizada de ProcessCapability para várias características de uma vez.
+    # Limites ausentes podem vir como NaN: com só um lado definido, RCPk usa o índice
+    # disponível (RCPs ou RCPi) e o ppm conta só a cauda desse lado; RCP exige os dois.
+    means, sigmas, lse, lie = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (means, sigmas, lse, lie)))
+    sigma = np.where(np.isfinite(sigmas) & (sigmas > 0), sigmas, np.nan)
+    with np.errstate(invalid='ignore'):
+        rcp = np.abs((lse - lie) / (6 * sigma))
+        rcps = (lse - means) / (3 * sigma)
+        rcpi = (means - lie) / (3 * sigma)
+        rcpk = np.abs(np.fmin(rcps, rcpi))
+        # Caudas calculadas separadamente (sem 1 - Φ) para não perder precisão com ppm baixos
+        upper_tail = np.where(np.isnan(lse), 0.0, ndtr(-3 * rcps))
+        lower_tail = np.where(np.isnan(lie), 0.0, ndtr(-3 * rcpi))
+        both_missing = np.isnan(lse) & np.isnan(lie)
+        ppm = np.where(both_missing | np.isnan(sigma) | np.isnan(means), np.nan, (upper_tail + lower_tail) * 1e6)
+    return CapabilityBatchResult(
+        process_mean=means,
+        sigma=sigma,
+        lse=lse,
+        lie=lie,
+        rcp=rcp,
+        rcpk=rcpk,
+        rcps=rcps,
+        rcpi=rcpi,
+        ppm=ppm,
+        success_probability=100 - ppm / 1e4
+    )
@@ -0,0 +1,169 @@
+import json
+import os
+import tempfile
+import numpy as np
+from typing import Iterable, Optional
+
+
+# Sketch de quantis t-digest (variante "merging"): centróides (média, peso) ordenados,
+# com tamanho máximo dado pela função de escala k(q) = δ/(4·ln(n/δ) + 24) · ln(q/(1-q)).
+# Centróides pequenos nas caudas preservam os quantis extremos (0,135% / 99,865%).
+# Memória limitada a ~compression centróides + buffer; sketches de partes diferentes
+# (shards, arquivos) se combinam com merge() e são salvos/lidos em JSON.
+DEFAULT_COMPRESSION = 500
+DEFAULT_BUFFER_SIZE = 50000
+
+
+class QuantileSketch:
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.compression = float(compression)
+        self.buffer_size = int(buffer_size)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._flush()
+        return self
+
+    @property
+    def count(self) -> float:
+        return self._count + self._buffered
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        other._flush()
+        self._flush()
+        if other._count == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        values = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        # Vetorizado: ordena, calcula a posição (quantil) de cada item e agrupa os itens
+        # consecutivos que caem na mesma unidade inteira de k(q)
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        left = (np.cumsum(weights) - weights) / total
+        cluster = np.floor(self._scale(left, total))
+        starts = np.flatnonzero(np.concatenate(([True], cluster[1:] != cluster[:-1])))
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+        self._count = float(total)
+
+    def _scale(self, q: np.ndarray, total: float) -> np.ndarray:
+        normalizer = self.compression / (4 * np.log(max(total / self.compression, 1.0)) + 24)
+        q = np.clip(q, 1e-15, 1 - 1e-15)
+        return normalizer * np.log(q / (1 - q))
+
+    def _curve(self):
+        # Posições acumuladas dos centros dos centróides, ancoradas no mínimo e no máximo
+        self._flush()
+        if self.count == 0:
+            raise ValueError("Sketch vazio: nenhum valor foi adicionado.")
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.concatenate(([0.0], centers, [self.count])), np.concatenate(([self.min], self.means, [self.max]))
+
+    def quantile(self, q):
+        ranks, values = self._curve()
+        return np.interp(np.asarray(q, dtype=np.float64) * self.count, ranks, values)
+
+    def cdf(self, x):
+        ranks, values = self._curve()
+        x = np.asarray(x, dtype=np.float64)
+        return np.where(x < self.min, 0.0, np.where(x >= self.max, 1.0, np.interp(x, values, ranks) / self.count))
+
+    def to_dict(self) -> dict:
+        self._flush()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(compression=data["compression"])
+        sketch.means = np.asarray(data["means"], dtype=np.float64)
+        sketch.weights = np.asarray(data["weights"], dtype=np.float64)
+        sketch._count = float(data["count"])
+        if sketch._count:
+            sketch.min, sketch.max = float(data["min"]), float(data["max"])
+        return sketch
+
+    def save(self, path: str):
+        # Escrita atômica, como as tabelas de constantes e o cache de relatórios
+        directory = os.path.dirname(path) or "."
+        fd, temp_path = tempfile.mkstemp(prefix=".sketch-", dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "QuantileSketch":
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"Erro ao ler {path}: {e}") from e
+
+
+def merge_sketches(sketches: Iterable, compression: Optional[float] = None) -> QuantileSketch:
+    # Aceita sketches ou caminhos de arquivos salvos com save()
+    merged = None
+    for sketch in sketches:
+        if isinstance(sketch, str):
+            sketch = QuantileSketch.load(sketch)
+        if merged is None:
+            merged = QuantileSketch(compression or sketch.compression)
+        merged.merge(sketch)
+    if merged is None:
+        raise ValueError("Nenhum sketch para combinar.")
+    return merged
+
+
+def sketch_from_file(url: str, field: str = "Valor", compression: float = DEFAULT_COMPRESSION, chunk_size: int = 100000) -> QuantileSketch:
+    # Lê o arquivo em blocos (dataset .cep via mmap ou JSON incremental) sem carregar tudo;
+    # campos com listas (ex.: "Dados" dos subgrupos) entram medição a medição
+    import cep_dataset
+    from AbstractCEP import iter_json_records
+    sketch = QuantileSketch(compression)
+    if cep_dataset.is_dataset(url):
+        column = cep_dataset.load_dataset(url)[field]
+        for start in range(0, len(column), chunk_size):
+            sketch.update(column[start:start + chunk_size])
+        return sketch
+    try:
+        for chunk in iter_json_records(url, chunk_size):
+            sketch.update(np.asarray([record[field] for record in chunk], dtype=np.float64))
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Erro ao ler {url}: campo '{field}' ausente ou inválido ({e})") from e
+    return sketch
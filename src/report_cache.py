@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Cache de artefatos (PNG/HTML) por conteúdo: a chave é o hash dos dados de
+# entrada, de constantes_cep.json, dos limites de especificação, do tipo de
+# gráfico e das opções de saída. Cada entrada é um diretório <chave>/ com os
+# arquivos e um meta.json; o acesso atualiza o mtime do meta.json (LRU).
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = ".cep_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+META_FILE = "meta.json"
+
+
+def _hash_path(digest, path: str):
+    # Arquivo: bytes do arquivo; diretório (ex.: dataset .cep): arquivos em ordem de nome
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            digest.update(name.encode('utf-8'))
+            _hash_path(digest, os.path.join(path, name))
+        return
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+
+def cache_key(chart_type: str, data_url: str, constants_url: str, lse: Optional[float] = None, lie: Optional[float] = None, options: Optional[dict] = None) -> str:
+    digest = hashlib.sha256()
+    params = {"version": CACHE_VERSION, "chart_type": chart_type, "lse": lse, "lie": lie, "options": options or {}}
+    digest.update(json.dumps(params, sort_keys=True, default=repr).encode('utf-8'))
+    for url in (data_url, constants_url):
+        try:
+            digest.update(b"\0")
+            _hash_path(digest, url)
+        except OSError as e:
+            raise ValueError(f"Erro ao ler {url}: {e}") from e
+    return digest.hexdigest()
+
+
+class ReportCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def restore(self, key: str, outputs: Dict[str, str]) -> Optional[dict]:
+        # outputs: nome do artefato -> caminho de destino; devolve o meta da entrada ou None
+        entry = self._entry(key)
+        meta_path = os.path.join(entry, META_FILE)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if any(path and name not in meta["files"] for name, path in outputs.items()):
+                return None
+            for name, path in outputs.items():
+                if path:
+                    shutil.copyfile(os.path.join(entry, name), path)
+            os.utime(meta_path)
+        except (OSError, ValueError, KeyError):
+            # Entrada ausente, incompleta ou removida por outro processo: trata como miss
+            return None
+        return meta
+
+    def store(self, key: str, outputs: Dict[str, str], info: Optional[dict] = None):
+        # Monta a entrada em um diretório temporário e publica com rename (atômico)
+        entry = self._entry(key)
+        if os.path.isdir(entry):
+            return
+        staging = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.cache_dir)
+        try:
+            files = []
+            for name, path in outputs.items():
+                if path and os.path.isfile(path):
+                    shutil.copyfile(path, os.path.join(staging, name))
+                    files.append(name)
+            with open(os.path.join(staging, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "files": files, "created": time.time(), "info": info}, f, ensure_ascii=False, default=float)
+            os.rename(staging, entry)
+        except OSError:
+            # Outro processo publicou a mesma chave primeiro
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        # (último acesso, tamanho em bytes, caminho) de cada entrada publicada
+        result = []
+        for name in os.listdir(self.cache_dir):
+            entry = self._entry(name)
+            meta_path = os.path.join(entry, META_FILE)
+            if name.startswith(".") or not os.path.isfile(meta_path):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(entry, file)) for file in os.listdir(entry))
+                result.append((os.path.getmtime(meta_path), size, entry))
+            except OSError:
+                continue
+        return result
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        # Remove as entradas menos usadas até o total caber em max_bytes
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for _, _, entry in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def cached_build(cache: ReportCache, key: str, outputs: Dict[str, str], build: Callable[[], Optional[dict]]) -> Tuple[bool, Optional[dict]]:
+    # Em hit copia os artefatos e devolve o info salvo; senão roda build() e guarda o resultado.
+    # build() deve levantar exceção quando falha: só um build concluído, com todos os
+    # artefatos gerados, vira entrada do cache
+    meta = cache.restore(key, outputs)
+    if meta is not None:
+        return True, meta.get("info")
+    info = build()
+    missing = [path for path in outputs.values() if path and not os.path.isfile(path)]
+    if missing:
+        raise RuntimeError(f"Artefatos não gerados: {', '.join(missing)}")
+    cache.store(key, outputs, info)
+    return False, info
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import contextlib
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+from report_cache import DEFAULT_MAX_BYTES, ReportCache, cache_key, cached_build
+
+
+@dataclass
+class ReportJob:
+    name: str
+    chart_type: str  # "XR", "XS", "IMR", "X", "P" ou "U"
+    data_url: str
+    constants_url: str = "json_files/constantes_cep.json"
+    lse: Optional[float] = None
+    lie: Optional[float] = None
+
+
+@dataclass
+class ReportJobResult:
+    name: str
+    chart_type: str
+    status: str
+    output_dir: str
+    png: str = ""
+    html: str = ""
+    log: str = ""
+    elapsed: float = 0.0
+    summary: Optional[dict] = None
+    error: str = ""
+    cached: bool = False
+
+
+def run_report_farm(jobs: List[ReportJob], output_root: str = "relatorios", max_workers: Optional[int] = None, cache_dir: Optional[str] = None, cache_max_bytes: int = DEFAULT_MAX_BYTES) -> List[ReportJobResult]:
+    # Cada job roda em um processo, com diretório de saída próprio (output_root/<nome>);
+    # o manifest.json em output_root resume o lote. Com cache_dir, jobs cujas entradas
+    # não mudaram reaproveitam PNG/HTML do cache (ver report_cache)
+    os.makedirs(output_root, exist_ok=True)
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Os nomes dos jobs devem ser únicos (usados como diretório de saída).")
+    jobs = [
+        ReportJob(**{**asdict(job), "data_url": os.path.abspath(job.data_url), "constants_url": os.path.abspath(job.constants_url)})
+        for job in jobs
+    ]
+    output_root = os.path.abspath(output_root)
+    cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_run_job, job, os.path.join(output_root, job.name), cache_dir, cache_max_bytes): job for job in jobs}
+        for future in as_completed(futures):
+            result = future.result()
+            origin = " (cache)" if result.cached else ""
+            print(f"[INFO] Job {result.name} ({result.chart_type}): {result.status}{origin} em {result.elapsed:.2f}s")
+            results.append(result)
+
+    results.sort(key=lambda result: names.index(result.name))
+    manifest = {
+        "total": len(results),
+        "ok": sum(1 for result in results if result.status == "ok"),
+        "erro": sum(1 for result in results if result.status != "ok"),
+        "jobs": [asdict(result) for result in results]
+    }
+    with open(os.path.join(output_root, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=float)
+    print(f"[INFO] Manifesto gerado: {os.path.join(output_root, 'manifest.json')}")
+    return results
+
+
+def _run_job(job: ReportJob, output_dir: str, cache_dir: Optional[str] = None, cache_max_bytes: int = DEFAULT_MAX_BYTES) -> ReportJobResult:
+    import matplotlib
+    matplotlib.use("Agg")
+
+    os.makedirs(output_dir, exist_ok=True)
+    png = os.path.join(output_dir, f"grafico_controle_{job.chart_type.lower()}.png")
+    html = os.path.join(output_dir, f"relatorio_cep_{job.chart_type.lower()}.html")
+    log = os.path.join(output_dir, "job.log")
+    result = ReportJobResult(name=job.name, chart_type=job.chart_type, status="ok", output_dir=output_dir, log=log)
+    start = time.perf_counter()
+    # Artefatos de uma execução anterior no mesmo output_dir não podem passar por sucesso
+    for path in (png, html):
+        if os.path.exists(path):
+            os.remove(path)
+    with open(log, 'w', encoding='utf-8') as log_file, contextlib.redirect_stdout(log_file), contextlib.redirect_stderr(log_file):
+        try:
+            if cache_dir:
+                cache = ReportCache(cache_dir, cache_max_bytes)
+                key = cache_key(job.chart_type, job.data_url, job.constants_url, job.lse, job.lie)
+                result.cached, result.summary = cached_build(cache, key, {"png": png, "html": html}, lambda: _build_report(job, png, html))
+                if result.cached:
+                    print(f"[INFO] Artefatos reaproveitados do cache ({key[:12]})")
+            else:
+                result.summary = _build_report(job, png, html)
+            result.png = png
+            result.html = html
+        except Exception as e:
+            result.status = "erro"
+            result.error = f"{type(e).__name__}: {e}"
+            print(f"[ERROR] {result.error}")
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _build_report(job: ReportJob, png: str, html: str) -> dict:
+    # Levanta exceção se o relatório não foi gerado: o job vira "erro" e nada vai para o cache
+    if job.chart_type in ("XR", "XS", "IMR", "X"):
+        if job.chart_type == "XR":
+            from x_r_graphs import XR_graph as chart_class
+        elif job.chart_type == "XS":
+            from x_s_graphs import XS_graph as chart_class
+        elif job.chart_type == "IMR":
+            from i_mr_graph import IMR_graph as chart_class
+        else:
+            from x_graph import X_graph as chart_class
+        chart = chart_class(job.data_url, job.constants_url, compute_only=True, output_png=png, output_html=html)
+        if job.lse is not None and job.lie is not None:
+            chart.set_specification_limits(job.lse, job.lie)
+        chart.analyze_control_status()
+        if chart.generate_report() is None:
+            raise RuntimeError(f"Relatório não foi gerado: {html}")
+        analysis = chart.get_analysis()
+        summary = {
+            "sigma": analysis.sigma,
+            "estado_x": analysis.x.state,
+            "violacoes_x": analysis.x.total_violations
+        }
+        if analysis.r is not None:
+            summary["estado_r"] = analysis.r.state
+            summary["violacoes_r"] = analysis.r.total_violations
+        if analysis.capability is not None:
+            summary["rcp"] = analysis.capability.rcp
+            summary["rcpk"] = analysis.capability.rcpk
+            if analysis.capability.rcp_ci is not None:
+                summary["rcp_ic"] = list(analysis.capability.rcp_ci)
+                summary["rcpk_ic"] = list(analysis.capability.rcpk_ci)
+        return summary
+    if job.chart_type in ("P", "U"):
+        from attributes_charts import PChart, UChart
+        chart_class = PChart if job.chart_type == "P" else UChart
+        chart = chart_class(data_url=job.data_url, constants_url=job.constants_url, output_png=png, output_html=html, compute_only=True)
+        chart.png_path = chart.plot(png)
+        chart.generate_html(chart.png_path, html)
+        analysis = chart.analyze_control_status()
+        return {key: analysis[key] for key in ("total", "out_of_control", "indices")}
+    raise ValueError(f"Tipo de gráfico desconhecido: {job.chart_type}")
@@ -0,0 +1,122 @@
+import os
+import json
+import math
+import tempfile
+from typing import Dict, Optional
+from scipy import integrate
+from scipy.special import gammaln, ndtr
+
+
+# Constantes de CEP para qualquer tamanho de subgrupo n, calculadas numericamente
+# a partir da distribuição da amplitude/desvio-padrão de amostras normais:
+#   d2 = E[R/σ]            d3 = DP[R/σ]            c4 = E[s/σ]
+#   A2 = 3/(d2·√n)         D3, D4 = 1 ∓ 3·d3/d2    (D3 truncado em 0)
+#   A3 = 3/(c4·√n)         B3, B4 = 1 ∓ 3·√(1-c4²)/c4 (B3 truncado em 0)
+# Valores calculados ficam memorizados no processo; os da tabela carregada
+# (constantes_cep.json) têm prioridade. Persistir em disco é opcional: passe table_path
+# ao ConstantsProvider ou use use_table_path(DEFAULT_TABLE_PATH) para todos os gráficos.
+CONSTANT_NAMES = ("d2", "d3", "c4", "A2", "A3", "B3", "B4", "D3", "D4")
+DEFAULT_TABLE_PATH = os.path.join(".cep_cache", "constantes_calculadas.json")
+_INTEGRATION_LIMIT = 12.0
+
+_computed: Dict[int, dict] = {}
+_loaded_paths = set()
+_default_table_path: Optional[str] = None
+
+
+def use_table_path(table_path: Optional[str]):
+    # Caminho da tabela persistida usado pelos providers sem table_path; None desliga
+    global _default_table_path
+    _default_table_path = table_path
+
+
+def compute_constants(n: int) -> dict:
+    n = _subgroup_size(n)
+    d2 = integrate.quad(lambda x: 1 - ndtr(x) ** n - ndtr(-x) ** n, -_INTEGRATION_LIMIT, _INTEGRATION_LIMIT, limit=200)[0]
+    # E[R²] = 2 ∫∫_{x<y} [1 - Φ(y)^n - (1-Φ(x))^n + (Φ(y)-Φ(x))^n] dy dx
+    second_moment = 2 * integrate.dblquad(
+        lambda y, x: 1 - ndtr(y) ** n - ndtr(-x) ** n + (ndtr(y) - ndtr(x)) ** n,
+        -_INTEGRATION_LIMIT, _INTEGRATION_LIMIT, lambda x: x, lambda x: _INTEGRATION_LIMIT,
+        epsabs=1e-10, epsrel=1e-10
+    )[0]
+    d3 = math.sqrt(max(second_moment - d2 ** 2, 0.0))
+    c4 = math.sqrt(2 / (n - 1)) * math.exp(gammaln(n / 2) - gammaln((n - 1) / 2))
+    b_spread = 3 * math.sqrt(1 - c4 ** 2) / c4
+    return {
+        "d2": d2,
+        "d3": d3,
+        "c4": c4,
+        "A2": 3 / (d2 * math.sqrt(n)),
+        "A3": 3 / (c4 * math.sqrt(n)),
+        "B3": max(0.0, 1 - b_spread),
+        "B4": 1 + b_spread,
+        "D3": max(0.0, 1 - 3 * d3 / d2),
+        "D4": 1 + 3 * d3 / d2
+    }
+
+
+class ConstantsProvider:
+    # Acesso como a tabela JSON original (provider[str(n)] ou provider[n]),
+    # completando constantes ausentes e tamanhos fora da tabela
+
+    def __init__(self, table: Optional[dict] = None, table_path: Optional[str] = None):
+        if isinstance(table, ConstantsProvider):
+            table = table.table
+        self.table = {str(key): dict(value) for key, value in (table or {}).items()}
+        self.table_path = table_path
+        self._resolved: Dict[int, dict] = {}
+
+    def __getitem__(self, n) -> dict:
+        n = _subgroup_size(n)
+        if n not in self._resolved:
+            given = self.table.get(str(n), {})
+            if any(name not in given for name in CONSTANT_NAMES):
+                given = {**_computed_constants(n, self.table_path or _default_table_path), **given}
+            self._resolved[n] = given
+        return self._resolved[n]
+
+    def __contains__(self, n) -> bool:
+        try:
+            _subgroup_size(n)
+        except (TypeError, ValueError):
+            return False
+        return True
+
+    def get(self, n, default=None):
+        return self[n] if n in self else default
+
+
+def _subgroup_size(n) -> int:
+    size = int(n)
+    if size != float(n) or size < 2:
+        raise ValueError(f"Tamanho de subgrupo inválido: {n} (esperado inteiro ≥ 2)")
+    return size
+
+
+def _computed_constants(n: int, table_path: Optional[str]) -> dict:
+    # Memória do processo -> tabela persistida (lida uma vez) -> cálculo numérico
+    if table_path and table_path not in _loaded_paths:
+        _loaded_paths.add(table_path)
+        try:
+            with open(table_path, 'r', encoding='utf-8') as f:
+                _computed.update({int(key): value for key, value in json.load(f).items()})
+        except (OSError, ValueError):
+            pass
+    if n not in _computed:
+        _computed[n] = compute_constants(n)
+        if table_path:
+            _persist(table_path)
+    return _computed[n]
+
+
+def _persist(table_path: str):
+    # Escrita atômica: outros processos leem a tabela antiga ou a nova, nunca parcial
+    directory = os.path.dirname(table_path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".constantes-", dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({str(key): value for key, value in sorted(_computed.items())}, f, indent=2)
+        os.replace(temp_path, table_path)
+    except OSError as e:
+        print(f"[WARNING] Não foi possível salvar {table_path}: {e}")
@@ -0,0 +1,114 @@
+import numpy as np
+from datetime import datetime
+from process_capability import CapabilityBatchResult, calculate_capability_batch
+import html_table
+
+
+# "E se" dos limites de especificação: reaproveita sigma e média já calculados por um
+# gráfico (XR_graph, XS_graph, X_graph, IMR_graph) e avalia uma grade de (LSE, LIE) em
+# uma chamada vetorizada, sem recarregar dados, recalcular limites de controle ou replotar.
+CAPABLE_RCPK = 1.33
+
+
+def process_statistics(chart):
+    # (média do processo, sigma) na mesma convenção de analysis_result
+    mean = chart.x_double_mean if hasattr(chart, "x_double_mean") else chart.x_mean
+    return float(mean), float(chart.sigma)
+
+
+def sweep_specification_limits(chart, lse, lie, outer: bool = False) -> CapabilityBatchResult:
+    # lse/lie: pares elemento a elemento (broadcasting) ou, com outer=True, a grade
+    # completa com shape (len(lse), len(lie)). Pares invertidos (LSE < LIE) seguem o caminho
+    # escalar (ProcessCapability, set_specification_limits): RCP e RCPk em módulo, como na questão 2.3.
+    mean, sigma = process_statistics(chart)
+    lse = np.asarray(lse, dtype=np.float64)
+    lie = np.asarray(lie, dtype=np.float64)
+    if outer:
+        lse, lie = np.meshgrid(lse.ravel(), lie.ravel(), indexing='ij')
+    return calculate_capability_batch(mean, sigma, lse, lie)
+
+
+def generate_sweep_report(chart, result: CapabilityBatchResult, output_file: str = "relatorio_limites_especificacao.html", render_profile=None) -> str:
+    # Relatório único comparando todos os pares; com grade 2-D inclui o mapa de RCPk
+    mean, sigma = process_statistics(chart)
+    summary = result.summary()
+    rcpk = summary["RCPk"].to_numpy()
+    capable = int(np.sum(rcpk >= CAPABLE_RCPK))
+    best_html = ""
+    if np.any(np.isfinite(rcpk)):
+        best = summary.iloc[int(np.nanargmax(rcpk))]
+        best_html = f"""
+        <p class=\"text-gray-700\"><strong>Melhor par (maior RCPk):</strong> LSE = {best['LSE']:.4f}, LIE = {best['LIE']:.4f}
+            (RCP = {best['RCP']:.4f}, RCPk = {best['RCPk']:.4f}, {best['ppm']:.1f} ppm)</p>"""
+
+    spec = html_table.table(len(summary))
+    for label, column, decimals in (("LSE", "LSE", 4), ("LIE", "LIE", 4), ("RCP", "RCP", 4), ("RCPs", "RCPs", 4), ("RCPi", "RCPi", 4), ("ppm", "ppm", 1), ("Rendimento (%)", "rendimento_pct", 4)):
+        html_table.add_column(spec, label, summary[column], decimals=decimals, mono=True)
+    rcpk_col = html_table.add_column(spec, "RCPk", rcpk, decimals=4, mono=True, out=~(rcpk >= CAPABLE_RCPK))
+    html_table.add_status_column(spec, f"Status (RCPk ≥ {CAPABLE_RCPK})", rcpk_col)
+
+    heatmap_html = ""
+    if result.rcpk.ndim == 2:
+        import chart_rendering
+        image = chart_rendering.png_data_uri(_plot_rcpk_map(result, render_profile))
+        heatmap_html = f"""
+<div class=\"mb-8\">
+    <h2 class=\"text-lg font-semibold mb-4\">Mapa de RCPk</h2>
+    <img src=\"{image}\" alt=\"Mapa de RCPk\" class=\"w-full\">
+</div>
+"""
+
+    html = f"""<!DOCTYPE html>
+<html lang=\"pt-BR\">
+<head>
+    <meta charset=\"UTF-8\">
+    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
+    <title>Relatório CEP - Limites de Especificação</title>
+    <script src=\"https://cdn.tailwindcss.com\"></script>
+    <style>
+        .font-mono {{ font-family: monospace; }}
+    </style>
+</head>
+<body class=\"bg-white text-gray-900 p-4\">
+<div class=\"container\">
+<div class=\"mb-8\">
+    <h1 class=\"text-2xl font-bold\">Relatório de Controle Estatístico de Processo</h1>
+    <h2 class=\"text-xl font-semibold\">Comparação de Limites de Especificação</h2>
+    <p class=\"text-gray-700\">Gerado em: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}</p>
+</div>
+<div class=\"mb-8 p-4 border rounded-lg shadow-sm bg-gray-50\">
+    <h2 class=\"text-lg font-semibold mb-4\">Processo</h2>
+    <p class=\"text-gray-700\"><strong>Média do Processo (μ):</strong> {mean:.6f}</p>
+    <p class=\"text-gray-700\"><strong>Sigma (σ):</strong> {sigma:.6f}</p>
+    <p class=\"text-gray-700\"><strong>Pares avaliados:</strong> {len(summary)} ({capable} com RCPk ≥ {CAPABLE_RCPK})</p>{best_html}
+</div>
+{heatmap_html}{html_table.render_table_html(spec, "cep-table-limites", "Pares (LSE, LIE)")}
+</div>
+<footer class=\"mt-8 text-sm text-gray-600\">
+    <p>Relatório CEP gerado automaticamente.</p>
+</footer>
+</body>
+</html>
+"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"[INFO] Relatório HTML gerado: {output_file}")
+    return output_file
+
+
+def _plot_rcpk_map(result: CapabilityBatchResult, render_profile=None) -> bytes:
+    import matplotlib.pyplot as plt
+    import chart_rendering
+    lse_values, lie_values = result.lse[:, 0], result.lie[0, :]
+    fig, ax = plt.subplots(1, 1, figsize=(10, 8))
+    image = ax.pcolormesh(lie_values, lse_values, result.rcpk, shading='nearest', cmap='RdYlGn')
+    levels = [1.0, CAPABLE_RCPK]
+    if np.nanmax(result.rcpk) > levels[0]:
+        contour = ax.contour(lie_values, lse_values, result.rcpk, levels=levels, colors='black', linewidths=1)
+        ax.clabel(contour, fmt='%.2f', fontsize=9)
+    fig.colorbar(image, ax=ax, label='RCPk')
+    ax.set_title('RCPk por par de limites de especificação', fontsize=14, fontweight='bold')
+    ax.set_xlabel('LIE', fontsize=12)
+    ax.set_ylabel('LSE', fontsize=12)
+    profile = chart_rendering.resolve_profile(render_profile)
+    return chart_rendering.render_png({"fig": fig}, profile)
@@ -0,0 +1,132 @@
+import json
+import math
+import numpy as np
+
+
+# Gráficos embutidos como dados: o HTML leva séries e limites em JSON compacto
+# e um renderizador SVG inline (sem dependências) desenha no navegador.
+# Estrutura da especificação:
+#   {"panels": [{"title", "xlabel", "ylabel", "ylim": [min, max], "x": [...],
+#                "series": [{"label", "color", "y": [...], "markers", "dash"}],
+#                "hlines": [{"label", "color", "y", "dash"}],
+#                "highlight": [índices]}]}
+
+
+def compact_values(values, decimals: int = 6) -> list:
+    # Casas decimais fixas (não algarismos significativos): valores grandes mantêm as
+    # mesmas casas que as tabelas do relatório (4 para variáveis, 6 para atributos)
+    return [None if not math.isfinite(v) else round(v, decimals) for v in np.asarray(values, dtype=float).tolist()]
+
+
+def exact_positions(x) -> list:
+    # Posições do eixo x sem arredondamento: índices inteiros ficam inteiros (amostra 1234567 ≠ 1234568)
+    positions = np.asarray(x, dtype=float)
+    if np.all(np.isfinite(positions)) and np.all(positions == np.round(positions)):
+        return positions.astype(np.int64).tolist()
+    return [None if not math.isfinite(v) else v for v in positions.tolist()]
+
+
+def panel(x, title="", xlabel="", ylabel="", ylim=None) -> dict:
+    return {
+        "title": title,
+        "xlabel": xlabel,
+        "ylabel": ylabel,
+        "ylim": compact_values(ylim) if ylim is not None else None,
+        "x": exact_positions(x),
+        "series": [],
+        "hlines": [],
+        "highlight": []
+    }
+
+
+def add_series(target: dict, y, label: str, color: str, markers: bool = True, dash: bool = False):
+    target["series"].append({"label": label, "color": color, "y": compact_values(y), "markers": markers, "dash": dash})
+
+
+def add_hline(target: dict, y: float, label: str, color: str, dash: bool = False):
+    target["hlines"].append({"label": label, "color": color, "y": compact_values([y])[0], "dash": dash})
+
+
+def render_chart_html(spec: dict, chart_id: str = "cep-chart") -> str:
+    data = json.dumps(spec, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    return f"""<div id=\"{chart_id}\" class=\"w-full\"></div>
+<script type=\"application/json\" id=\"{chart_id}-data\">{data}</script>
+<script>{_RENDERER_JS}cepDrawChart(\"{chart_id}\");</script>
+"""
+
+
+_RENDERER_JS = """
+if (typeof cepDrawChart === "undefined") {
+var cepDrawChart = function (id) {
+  var spec = JSON.parse(document.getElementById(id + "-data").textContent);
+  var root = document.getElementById(id), ns = "http://www.w3.org/2000/svg";
+  var W = 1200, H = 420, L = 70, R = 20, T = 36, B = 48;
+  function el(tag, attrs, parent, text) {
+    var e = document.createElementNS(ns, tag);
+    for (var k in attrs) e.setAttribute(k, attrs[k]);
+    if (text !== undefined) e.textContent = text;
+    parent.appendChild(e); return e;
+  }
+  function extent(values) {
+    var lo = Infinity, hi = -Infinity;
+    values.forEach(function (v) { if (v !== null) { if (v < lo) lo = v; if (v > hi) hi = v; } });
+    return [lo, hi];
+  }
+  function ticks(lo, hi, n, integer) {
+    var step = Math.pow(10, Math.floor(Math.log10((hi - lo) / n || 1)));
+    [1, 2, 2.5, 5, 10].some(function (m) { if ((hi - lo) / (step * m) <= n) { step *= m; return true; } });
+    if (integer) step = Math.max(1, Math.round(step));
+    var out = [];
+    for (var v = Math.ceil(lo / step) * step; v <= hi + step * 1e-9; v += step) out.push(+v.toPrecision(12));
+    return out;
+  }
+  spec.panels.forEach(function (p) {
+    var svg = el("svg", {viewBox: "0 0 " + W + " " + H, width: "100%", "font-family": "sans-serif", "font-size": 12}, root);
+    var xs = p.x, xe = extent(xs), x0 = xe[0], x1 = xe[1], xm = (x1 - x0) * 0.05 || 0.5;
+    x0 -= xm; x1 += xm;
+    var ye = extent(p.hlines.map(function (h) { return h.y; }));
+    p.series.forEach(function (s) { var e = extent(s.y); ye = [Math.min(ye[0], e[0]), Math.max(ye[1], e[1])]; });
+    var y0 = p.ylim ? p.ylim[0] : ye[0], y1 = p.ylim ? p.ylim[1] : ye[1];
+    if (!p.ylim) { var ym = (y1 - y0) * 0.05 || 0.5; y0 -= ym; y1 += ym; }
+    function sx(v) { return L + (v - x0) / (x1 - x0) * (W - L - R); }
+    function sy(v) { return H - B - (v - y0) / (y1 - y0) * (H - T - B); }
+    ticks(y0, y1, 8, false).forEach(function (v) {
+      el("line", {x1: L, x2: W - R, y1: sy(v), y2: sy(v), stroke: "#ddd"}, svg);
+      el("text", {x: L - 6, y: sy(v) + 4, "text-anchor": "end"}, svg, v);
+    });
+    ticks(x0, x1, 12, true).forEach(function (v) {
+      el("line", {x1: sx(v), x2: sx(v), y1: T, y2: H - B, stroke: "#eee"}, svg);
+      el("text", {x: sx(v), y: H - B + 16, "text-anchor": "middle"}, svg, v);
+    });
+    el("rect", {x: L, y: T, width: W - L - R, height: H - T - B, fill: "none", stroke: "#333"}, svg);
+    if (p.title) el("text", {x: W / 2, y: 20, "text-anchor": "middle", "font-weight": "bold", "font-size": 15}, svg, p.title);
+    el("text", {x: (L + W - R) / 2, y: H - 10, "text-anchor": "middle", "font-size": 13}, svg, p.xlabel);
+    el("text", {x: 16, y: (T + H - B) / 2, "text-anchor": "middle", "font-size": 13, transform: "rotate(-90 16 " + (T + H - B) / 2 + ")"}, svg, p.ylabel);
+    var legend = [];
+    p.hlines.forEach(function (h) {
+      el("line", {x1: L, x2: W - R, y1: sy(h.y), y2: sy(h.y), stroke: h.color, "stroke-width": 2, "stroke-dasharray": h.dash ? "8 5" : ""}, svg);
+    });
+    p.series.forEach(function (s) {
+      var pts = [];
+      s.y.forEach(function (v, i) { if (v !== null) pts.push(sx(xs[i]) + "," + sy(v)); });
+      el("polyline", {points: pts.join(" "), fill: "none", stroke: s.color, "stroke-width": 2, "stroke-dasharray": s.dash ? "8 5" : ""}, svg);
+      if (s.markers && pts.length <= 2000) pts.forEach(function (pt) {
+        var c = pt.split(","); el("circle", {cx: c[0], cy: c[1], r: 4, fill: s.color}, svg);
+      });
+      legend.push(s);
+    });
+    legend = legend.concat(p.hlines);
+    p.highlight.forEach(function (i) {
+      el("circle", {cx: sx(xs[i]), cy: sy(p.series[0].y[i]), r: 8, fill: "none", stroke: "red", "stroke-width": 3}, svg);
+    });
+    var lx = W - R - 190, ly = T + 8;
+    el("rect", {x: lx, y: ly, width: 182, height: legend.length * 18 + 8, fill: "white", stroke: "#ccc", opacity: 0.9}, svg);
+    legend.forEach(function (item, i) {
+      var yy = ly + 14 + i * 18;
+      el("line", {x1: lx + 8, x2: lx + 34, y1: yy, y2: yy, stroke: item.color, "stroke-width": 2, "stroke-dasharray": item.dash ? "6 4" : ""}, svg);
+      el("text", {x: lx + 40, y: yy + 4}, svg, item.label);
+    });
+  });
+};
+}
+"""
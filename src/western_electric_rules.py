@@ -1,18 +1,21 @@
 import pandas as pd
 import numpy as np
+from collections import deque
 from typing import List, Tuple, Dict
 
 
 class WesternElectricAnalyzer:
 
     
-    def __init__(self, data: pd.Series, lc: float, lsc: float, lic: float, chart_name: str = "Gráfico"):
+    def __init__(self, data: pd.Series, lc: float, lsc: float, lic: float, chart_name: str = "Gráfico", vectorized: bool = True):
 
         self.data = data
         self.lc = lc
         self.lsc = lsc
         self.lic = lic
         self.chart_name = chart_name
+        # vectorized=False mantém os laços originais como implementação de referência
+        self.vectorized = vectorized
         
        
         self.sigma = (lsc - lc) / 3  
@@ -44,6 +47,8 @@ class WesternElectricAnalyzer:
     
     def rule1_one_point_beyond_3sigma(self):
 
+        if self.vectorized:
+            return self._rule1_vectorized()
         for idx, value in enumerate(self.data):
             if value > self.lsc or value < self.lic:
                 position = idx + 1 if hasattr(self.data, 'index') else idx
@@ -56,6 +61,8 @@ class WesternElectricAnalyzer:
     
     def rule2_two_of_three_beyond_2sigma(self):
 
+        if self.vectorized:
+            return self._rule2_vectorized()
         for i in range(len(self.data) - 2):
             window = self.data.iloc[i:i+3] if hasattr(self.data, 'iloc') else self.data[i:i+3]
             
@@ -79,6 +86,8 @@ class WesternElectricAnalyzer:
     
     def rule3_four_of_five_beyond_1sigma(self):
         
+        if self.vectorized:
+            return self._rule3_vectorized()
         for i in range(len(self.data) - 4):
             window = self.data.iloc[i:i+5] if hasattr(self.data, 'iloc') else self.data[i:i+5]
             
@@ -102,6 +111,8 @@ class WesternElectricAnalyzer:
     
     def rule4_eight_consecutive_same_side(self):
         
+        if self.vectorized:
+            return self._rule4_vectorized()
         for i in range(len(self.data) - 7):
             window = self.data.iloc[i:i+8] if hasattr(self.data, 'iloc') else self.data[i:i+8]
             
@@ -122,6 +133,206 @@ class WesternElectricAnalyzer:
                     'positions': positions,
                     'description': f"Pontos {positions[0]}-{positions[-1]}: 8 pontos consecutivos abaixo da LC ({self.lc:.4f})"
                 })
+
+    def _values(self) -> np.ndarray:
+        values = self.data.to_numpy() if hasattr(self.data, 'to_numpy') else self.data
+        return np.asarray(values, dtype=float)
+
+    def _rule1_vectorized(self):
+
+        values = self._values()
+        offset = 1 if hasattr(self.data, 'index') else 0
+        for idx in np.flatnonzero((values > self.lsc) | (values < self.lic)):
+            value = values[idx].item()
+            position = int(idx) + offset
+            side = "acima do LSC" if value > self.lsc else "abaixo do LIC"
+            self.violations['rule1'].append({
+                'position': position,
+                'value': value,
+                'description': f"Ponto {position}: {value:.4f} ({side})"
+            })
+
+    def _window_violations(self, upper: np.ndarray, lower: np.ndarray, window: int, minimum: int):
+        # Janelas (upper antes de lower) na mesma ordem dos laços originais
+        upper_hits = _window_counts(upper, window) >= minimum
+        lower_hits = _window_counts(lower, window) >= minimum
+        for i in np.flatnonzero(upper_hits | lower_hits):
+            i = int(i)
+            if upper_hits[i]:
+                yield i, 'upper', [i + 1 + int(j) for j in np.flatnonzero(upper[i:i + window])]
+            if lower_hits[i]:
+                yield i, 'lower', [i + 1 + int(j) for j in np.flatnonzero(lower[i:i + window])]
+
+    def _rule2_vectorized(self):
+
+        values = self._values()
+        for _, side, positions in self._window_violations(values > self.zone_a_upper, values < self.zone_a_lower, 3, 2):
+            self.violations['rule2'].append({
+                'positions': positions,
+                'description': _describe_window(self, 'rule2', side, positions)
+            })
+
+    def _rule3_vectorized(self):
+
+        values = self._values()
+        for _, side, positions in self._window_violations(values > self.zone_b_upper, values < self.zone_b_lower, 5, 4):
+            self.violations['rule3'].append({
+                'positions': positions,
+                'description': _describe_window(self, 'rule3', side, positions)
+            })
+
+    def _rule4_vectorized(self):
+
+        values = self._values()
+        for i, side, _ in self._window_violations(values > self.lc, values < self.lc, 8, 8):
+            positions = list(range(i + 1, i + 9))
+            self.violations['rule4'].append({
+                'positions': positions,
+                'description': _describe_window(self, 'rule4', side, positions)
+            })
+
+
+class WesternElectricMonitor:
+    # Monitor incremental: cada push() custa O(1) em tempo e memória
+
+    def __init__(self, lc: float, lsc: float, lic: float, chart_name: str = "Gráfico"):
+
+        self.chart_name = chart_name
+        self.set_limits(lc, lsc, lic)
+
+        self.position = 0
+        self._a_upper = _RollingWindow(3)
+        self._a_lower = _RollingWindow(3)
+        self._b_upper = _RollingWindow(5)
+        self._b_lower = _RollingWindow(5)
+        self._run_above = 0
+        self._run_below = 0
+
+        self.counts = {
+            'rule1': 0,
+            'rule2': 0,
+            'rule3': 0,
+            'rule4': 0
+        }
+        self.state = "estavel"
+
+    def set_limits(self, lc: float, lsc: float, lic: float):
+        # Limites móveis (ex.: I-MR): os próximos pontos usam as novas zonas; as janelas já
+        # acumuladas guardam a classificação feita com os limites vigentes em cada ponto
+        self.lc = lc
+        self.lsc = lsc
+        self.lic = lic
+
+        self.sigma = (lsc - lc) / 3
+
+        self.zone_a_upper = lc + 2 * self.sigma
+        self.zone_a_lower = lc - 2 * self.sigma
+        self.zone_b_upper = lc + self.sigma
+        self.zone_b_lower = lc - self.sigma
+
+    @classmethod
+    def from_analyzer(cls, analyzer: WesternElectricAnalyzer) -> "WesternElectricMonitor":
+        return cls(analyzer.lc, analyzer.lsc, analyzer.lic, analyzer.chart_name)
+
+    def push(self, value: float) -> List[Dict]:
+
+        self.position += 1
+        position = self.position
+        new_violations = []
+
+        if value > self.lsc or value < self.lic:
+            side = "acima do LSC" if value > self.lsc else "abaixo do LIC"
+            new_violations.append({
+                'rule': 'rule1',
+                'position': position,
+                'value': value,
+                'description': f"Ponto {position}: {value:.4f} ({side})"
+            })
+
+        for rule, side, window, minimum in (
+            ('rule2', 'upper', self._a_upper.push(value > self.zone_a_upper), 2),
+            ('rule2', 'lower', self._a_lower.push(value < self.zone_a_lower), 2),
+            ('rule3', 'upper', self._b_upper.push(value > self.zone_b_upper), 4),
+            ('rule3', 'lower', self._b_lower.push(value < self.zone_b_lower), 4),
+        ):
+            if window.is_full and window.count >= minimum:
+                positions = window.positions(position)
+                new_violations.append({
+                    'rule': rule,
+                    'positions': positions,
+                    'description': _describe_window(self, rule, side, positions)
+                })
+
+        self._run_above = self._run_above + 1 if value > self.lc else 0
+        self._run_below = self._run_below + 1 if value < self.lc else 0
+        for side, run in (('upper', self._run_above), ('lower', self._run_below)):
+            if run >= 8:
+                positions = list(range(position - 7, position + 1))
+                new_violations.append({
+                    'rule': 'rule4',
+                    'positions': positions,
+                    'description': _describe_window(self, 'rule4', side, positions)
+                })
+
+        for violation in new_violations:
+            self.counts[violation['rule']] += 1
+        if new_violations:
+            self.state = "instavel"
+        return new_violations
+
+    def push_many(self, values) -> List[Dict]:
+
+        new_violations = []
+        for value in values:
+            new_violations.extend(self.push(value))
+        return new_violations
+
+
+class _RollingWindow:
+    # Buffer circular de flags com contagem corrente
+
+    def __init__(self, size: int):
+        self.size = size
+        self.flags = deque(maxlen=size)
+        self.count = 0
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.flags) == self.size
+
+    def push(self, flag: bool) -> "_RollingWindow":
+        if self.is_full:
+            self.count -= self.flags[0]
+        self.flags.append(bool(flag))
+        self.count += bool(flag)
+        return self
+
+    def positions(self, last_position: int) -> List[int]:
+        first = last_position - len(self.flags) + 1
+        return [first + j for j, flag in enumerate(self.flags) if flag]
+
+
+def _describe_window(limits, rule: str, side: str, positions: List[int]) -> str:
+    if rule == 'rule2':
+        if side == 'upper':
+            return f"Pontos {positions}: 2 de 3 pontos consecutivos acima de +2σ ({limits.zone_a_upper:.4f})"
+        return f"Pontos {positions}: 2 de 3 pontos consecutivos abaixo de -2σ ({limits.zone_a_lower:.4f})"
+    if rule == 'rule3':
+        if side == 'upper':
+            return f"Pontos {positions}: 4 de 5 pontos consecutivos acima de +1σ ({limits.zone_b_upper:.4f})"
+        return f"Pontos {positions}: 4 de 5 pontos consecutivos abaixo de -1σ ({limits.zone_b_lower:.4f})"
+    if side == 'upper':
+        return f"Pontos {positions[0]}-{positions[-1]}: 8 pontos consecutivos acima da LC ({limits.lc:.4f})"
+    return f"Pontos {positions[0]}-{positions[-1]}: 8 pontos consecutivos abaixo da LC ({limits.lc:.4f})"
+
+
+def _window_counts(mask: np.ndarray, window: int) -> np.ndarray:
+    # Contagem de pontos marcados em cada janela deslizante via soma acumulada
+    if len(mask) < window:
+        return np.zeros(0, dtype=np.int64)
+    cumulative = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    return cumulative[window:] - cumulative[:-window]
+
     
 def analyze_xr_chart(xr_graph_instance):
     
@@ -142,6 +353,7 @@ def analyze_xr_chart(xr_graph_instance):
         chart_name="Gráfico R"
     )
     analyzer_r.analyze_all_rules()
+    return analyzer_x, analyzer_r
 
 
 
@@ -155,4 +367,43 @@ def analyze_x_chart(x_graph_instance):
         chart_name="Gráfico X (Medidas Individuais)"
     )
     analyzer_x.analyze_all_rules()
+    return analyzer_x
 
+
+def analyze_xs_chart(xs_graph_instance):
+    # Com n variável os limites mudam por subgrupo: as regras rodam sobre os valores
+    # padronizados (LC = 0, LSC/LIC = ±3), equivalentes aos limites por subgrupo
+    df = xs_graph_instance.df
+    if xs_graph_instance.variable_n:
+        sigma = xs_graph_instance.sigma
+        sizes = df['n'].to_numpy()
+        c4 = df['LC_S'].to_numpy() / sigma
+        x_series = (df['X_bar'] - xs_graph_instance.x_double_mean) / (sigma / np.sqrt(sizes))
+        s_series = (df['S'] - df['LC_S']) / (sigma * np.sqrt(1 - c4 ** 2))
+        x_limits = s_limits = (0.0, 3.0, -3.0)
+        suffix = " (padronizado)"
+    else:
+        x_series, s_series = df['X_bar'], df['S']
+        x_limits = (xs_graph_instance.x_double_mean, xs_graph_instance.lsc_x_bar_graph, xs_graph_instance.lic_x_bar_graph)
+        s_limits = (xs_graph_instance.s_mean, xs_graph_instance.lsc_s_graph, xs_graph_instance.lic_s_graph)
+        suffix = ""
+
+    analyzer_x = WesternElectricAnalyzer(x_series, *x_limits, chart_name=f"Gráfico X-barra{suffix}")
+    analyzer_x.analyze_all_rules()
+    analyzer_s = WesternElectricAnalyzer(s_series, *s_limits, chart_name=f"Gráfico S{suffix}")
+    analyzer_s.analyze_all_rules()
+    return analyzer_x, analyzer_s
+
+
+def analyze_imr_chart(imr_graph_instance):
+
+    analyzer_x = analyze_x_chart(imr_graph_instance)
+    analyzer_mr = WesternElectricAnalyzer(
+        data=imr_graph_instance.df['MR'],
+        lc=imr_graph_instance.mr_mean,
+        lsc=imr_graph_instance.lsc_mr_graph,
+        lic=imr_graph_instance.lic_mr_graph,
+        chart_name="Gráfico MR (Amplitude Móvel)"
+    )
+    analyzer_mr.analyze_all_rules()
+    return analyzer_x, analyzer_mr
@@ -1,24 +1,22 @@
-from abc import ABC
 import AbstractCEP as AbstractCEP
 from pandas import DataFrame
 import pandas as pd
 import matplotlib.pyplot as plt
-import western_electric_rules as wer
-import report_bridge as rg
+import numpy as np
+import chart_rendering
+import svg_chart
 
 
-class X_graph(AbstractCEP.AbstractControlChart):
+class X_graph(AbstractCEP.AbstractVariablesChart):
+    chart_type = "X"
     df: DataFrame
     sigma: float
     x_mean: float
     lsc_x_graph: float
     lic_x_graph: float
-    lse: float = None
-    lie: float = None
 
-    def __init__(self, data_url="json_files/dados_individuais.json", constants_url="json_files/constantes_cep.json"):
-        super().__init__(data_url, constants_url)
-        self.normalize_data()
+    def __init__(self, data_url="json_files/dados_individuais.json", constants_url="json_files/constantes_cep.json", streaming=False, compute_only=False, output_png='grafico_controle_x.png', output_html='relatorio_cep_x.html', render_profile=None, chart_format="png", table_mode="full"):
+        super().__init__(data_url, constants_url, streaming=streaming, compute_only=compute_only, output_png=output_png, output_html=output_html, render_profile=render_profile, chart_format=chart_format, table_mode=table_mode)
 
     def normalize_data(self):
         self.df = pd.DataFrame(self.data)
@@ -44,79 +42,67 @@ class X_graph(AbstractCEP.AbstractControlChart):
         print(f"LIC (X): {self.lic_x_graph}")
         print(f"LC (X): {self.x_mean}")
         print(f"LSC (X): {self.lsc_x_graph}")
-        self.plot_control_charts()
+        if not self.compute_only and self.chart_format == "png":
+            self.plot_control_charts()
 
-    def plot_control_charts(self):
-
-       
+    @staticmethod
+    def _build_figure():
         fig, ax1 = plt.subplots(1, 1, figsize=(16, 8))
-        
-        x_min = min(self.df['Valor'].min(), self.lic_x_graph)
-        x_max = max(self.df['Valor'].max(), self.lsc_x_graph)
-        x_margin = (x_max - x_min) * 0.15
-        
-        
-        ax1.plot(self.df['Medida'], self.df['Valor'], 'bo-', linewidth=2, markersize=6, label='X (Medidas Individuais)')
-        ax1.axhline(y=self.x_mean, color='green', linestyle='-', linewidth=2, label=f'LC = {self.x_mean:.4f}')
-        ax1.axhline(y=self.lsc_x_graph, color='red', linestyle='--', linewidth=2, label=f'LSC = {self.lsc_x_graph:.4f}')
-        ax1.axhline(y=self.lic_x_graph, color='red', linestyle='--', linewidth=2, label=f'LIC = {self.lic_x_graph:.4f}')
-        
+        template = {"fig": fig, "ax1": ax1}
+        template["x"], = ax1.plot([], [], 'bo-', linewidth=2, markersize=6, label='X (Medidas Individuais)')
+        template["lc"] = ax1.axhline(y=0, color='green', linestyle='-', linewidth=2)
+        template["lsc"] = ax1.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["lic"] = ax1.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["out"] = ax1.scatter(np.empty(0), np.empty(0), color='red', s=100, marker='o', facecolors='none', edgecolors='red', linewidth=3)
         ax1.set_title('Gráfico de Controle X (Medidas Individuais)', fontsize=14, fontweight='bold', pad=20)
         ax1.set_xlabel('Número da Medida', fontsize=12)
         ax1.set_ylabel('Valor (X)', fontsize=12)
         ax1.grid(True, alpha=0.3)
-        ax1.legend(loc='upper right', fontsize=10)
-        ax1.set_ylim(x_min - x_margin, x_max + x_margin)
-        
-        
-        out_of_control_x = self.df[(self.df['Valor'] > self.lsc_x_graph) | (self.df['Valor'] < self.lic_x_graph)]
-        if not out_of_control_x.empty:
-            ax1.scatter(out_of_control_x['Medida'], out_of_control_x['Valor'], 
-                       color='red', s=100, marker='o', facecolors='none', edgecolors='red', linewidth=3)
-        
-        
-        plt.tight_layout()
-        
-        
-        plt.savefig('grafico_controle_x.png', dpi=300, bbox_inches='tight')
-        print("Gráfico salvo como 'grafico_controle_x.png'")
-        
-       
-        plt.close(fig)
-        
-       
-    def analyze_control_status(self):
-     
-        
-        out_of_control_x = self.df[(self.df['Valor'] > self.lsc_x_graph) | (self.df['Valor'] < self.lic_x_graph)]
-        
-        print(f"Quantidade de termos fora dos limites de controle: {len(out_of_control_x)}")
-        
-        
-        if self.lse is not None and self.lie is not None:
-            from process_capability import ProcessCapability
-            capability = ProcessCapability(
-                sigma=self.sigma,
-                lse=self.lse,
-                lie=self.lie
-            )
-            capability.set_process_mean(self.x_mean)
-            capability.calculate_all()
-            
-            
-            self.capability = capability
-            
-        
+        return template
 
-        wer.analyze_x_chart(self)
-        
-        
-        rg.generate_report_from_instance(self, chart_type="X")
+    def _y_range(self):
+        x_min = min(self.df['Valor'].min(), self.lic_x_graph)
+        x_max = max(self.df['Valor'].max(), self.lsc_x_graph)
+        x_margin = (x_max - x_min) * 0.15
+        return x_min - x_margin, x_max + x_margin
+
+    def _out_of_control_mask(self):
+        return ((self.df['Valor'] > self.lsc_x_graph) | (self.df['Valor'] < self.lic_x_graph)).to_numpy()
+
+    def _update_figure(self, template):
+        ax1 = template["ax1"]
+        measures = chart_rendering.sample_positions(self.df['Medida'])
+        template["x"].set_data(measures, self.df['Valor'])
+        for key, value, label in (
+            ("lc", self.x_mean, 'LC'),
+            ("lsc", self.lsc_x_graph, 'LSC'),
+            ("lic", self.lic_x_graph, 'LIC'),
+        ):
+            template[key].set_ydata([value, value])
+            template[key].set_label(f'{label} = {value:.4f}')
+        # Legenda apenas com as linhas (o destaque de pontos fora não tem rótulo)
+        ax1.legend(handles=[template[key] for key in ("x", "lc", "lsc", "lic")], loc='upper right', fontsize=10)
+        ax1.set_ylim(*self._y_range())
+        chart_rendering.set_x_range(ax1, measures)
+
+        out_of_control = self._out_of_control_mask()
+        template["out"].set_offsets(np.column_stack([measures[out_of_control], self.df['Valor'].to_numpy()[out_of_control]]))
+
+    def chart_spec(self):
+        measures = chart_rendering.sample_positions(self.df['Medida'])
+        x_panel = svg_chart.panel(measures, title='Gráfico de Controle X (Medidas Individuais)', xlabel='Número da Medida', ylabel='Valor (X)', ylim=self._y_range())
+        svg_chart.add_series(x_panel, self.df['Valor'], 'X (Medidas Individuais)', 'blue')
+        svg_chart.add_hline(x_panel, self.x_mean, f'LC = {self.x_mean:.4f}', 'green')
+        svg_chart.add_hline(x_panel, self.lsc_x_graph, f'LSC = {self.lsc_x_graph:.4f}', 'red', dash=True)
+        svg_chart.add_hline(x_panel, self.lic_x_graph, f'LIC = {self.lic_x_graph:.4f}', 'red', dash=True)
+        x_panel["highlight"] = np.flatnonzero(self._out_of_control_mask()).tolist()
+        return {"panels": [x_panel]}
 
     def set_specification_limits(self, lse: float, lie: float):
 
         self.lse = lse
         self.lie = lie
+        self.analysis = None
         print(f"[INFO]: Limites de especificação atualizados:")
         print(f"   LSE (Limite Superior): {self.lse:.4f}")
         print(f"   LIE (Limite Inferior): {self.lie:.4f}")
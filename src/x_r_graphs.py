@@ -1,14 +1,15 @@
-from abc import ABC
 import AbstractCEP as AbstractCEP
-from pandas import DataFrame
+from AbstractCEP import _pad
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-import western_electric_rules as wer
-import report_bridge as rg
+import chart_rendering
+import svg_chart
 
 
-class XR_graph(AbstractCEP.AbstractControlChart):
-    df: DataFrame
+class XR_graph(AbstractCEP.AbstractSubgroupChart):
+    chart_type = "XR"
+    analyzer_names = ("analyzer_x", "analyzer_r")
     x_data: list
     sigma: float
     r_mean: float
@@ -17,44 +18,53 @@ class XR_graph(AbstractCEP.AbstractControlChart):
     lic_x_bar_graph: float
     lsc_r_bar_graph: float
     lic_r_bar_graph: float
-    lse: float = None
-    lie: float = None
 
-    def __init__(self, data_url="json_files/dados.json", constants_url="json_files/constantes_cep.json"):
-        super().__init__(data_url, constants_url)
-        self.normalize_data()
+    def __init__(self, data_url="json_files/dados.json", constants_url="json_files/constantes_cep.json", streaming=False, compute_only=False, output_png='grafico_controle_xr.png', output_html='relatorio_cep_xr.html', render_profile=None, chart_format="png", table_mode="full"):
+        super().__init__(data_url, constants_url, streaming=streaming, compute_only=compute_only, output_png=output_png, output_html=output_html, render_profile=render_profile, chart_format=chart_format, table_mode=table_mode)
+
+    @property
+    def x_columns(self):
+        return [f'X{i+1}' for i in range(self._base.shape[1])]
+
+    def _build_frame(self, frame):
+        frame = pd.concat([frame, pd.DataFrame(self.subgroups, columns=self.x_columns, index=frame.index)], axis=1)
+        return super()._build_frame(frame)
 
     def normalize_data(self):
-        self.df = pd.DataFrame(self.data)
-        data_columns = self.df["Dados"].apply(pd.Series)
-        data_columns = data_columns.rename(columns=lambda x: f'X{x+1}')
-        self.df = pd.concat([self.df.drop(columns=["Dados"], axis=1), data_columns], axis=1)
+        self._load_subgroups()
+        self._x_bar_sum = self._r_sum = 0.0
         print("DataFrame completo:")
         print(self.df)
         self.calculate_xbar_and_r()
 
     def calculate_xbar_and_r(self):
-        x_columns = [col for col in self.df.columns if col.startswith('X')]
-        self.df["X_bar"] = self.df[x_columns].mean(axis=1)
-        self.df["R"] = self.df[x_columns].max(axis=1) - self.df[x_columns].min(axis=1)
+        self._store_statistics(self._subgroup_statistics(self._base))
         print("Tabela X-R completa:")
         print(self.df)
         self.calculate_internal_metrics()
 
+    @staticmethod
+    def _subgroup_statistics(rows):
+        return {"X_bar": np.nanmean(rows, axis=1), "R": np.nanmax(rows, axis=1) - np.nanmin(rows, axis=1)}
+
+    def _store_statistics(self, statistics):
+        super()._store_statistics(statistics)
+        self._x_bar_sum += statistics["X_bar"].sum()
+        self._r_sum += statistics["R"].sum()
+
     def calculate_internal_metrics(self):
         self.r_mean = self.df["R"].mean()
         print(f"R_BAR: {self.r_mean}")
-        n_size = len([col for col in self.df.columns if col.startswith('X')])
-        d2_value = self.constants_table[str(n_size)]["d2"]
-        self.sigma = self.r_mean / d2_value
+        # Constantes do tamanho de subgrupo, obtidas uma vez (ver spc_constants)
+        self.constants = self.constants_table[len(self.x_columns)]
+        self.sigma = self.r_mean / self.constants["d2"]
         print(f"SIGMA: {self.sigma}")
         self.x_double_mean = self.df["X_bar"].mean()
         print(f"X_DOUBLE_BAR: {self.x_double_mean}")
         self.limits_calculation_x_bar_graph()
 
     def limits_calculation_x_bar_graph(self):
-        n_size = len([col for col in self.df.columns if col.startswith('X')])
-        a2_value = self.constants_table[str(n_size)]["A2"]
+        a2_value = self.constants["A2"]
         self.lsc_x_bar_graph = self.x_double_mean + (a2_value * self.r_mean)
         self.lic_x_bar_graph = self.x_double_mean - (a2_value * self.r_mean)
         print(f"LIC (X_BAR): {self.lic_x_bar_graph}")
@@ -63,85 +73,97 @@ class XR_graph(AbstractCEP.AbstractControlChart):
         self.limits_calculation_r_graph()
 
     def limits_calculation_r_graph(self):
-        n_size = len([col for col in self.df.columns if col.startswith('X')])
-        d3_value = self.constants_table[str(n_size)]["D3"]
-        d4_value = self.constants_table[str(n_size)]["D4"]
+        d3_value = self.constants["D3"]
+        d4_value = self.constants["D4"]
         self.lsc_r_bar_graph = self.r_mean * d4_value
         self.lic_r_bar_graph = self.r_mean * d3_value
         print(f"LIC (R): {self.lic_r_bar_graph}")
         print(f"LC (R): {self.r_mean}")
         print(f"LSC (R): {self.lsc_r_bar_graph}")
-        self.plot_control_charts()
+        if not self.compute_only and self.chart_format == "png":
+            self.plot_control_charts()
 
-    def plot_control_charts(self):
+    @staticmethod
+    def _build_figure():
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
+        template = {"fig": fig, "ax1": ax1, "ax2": ax2}
+        template["x_bar"], = ax1.plot([], [], 'bo-', linewidth=2, markersize=6, label='X̄')
+        template["x_lc"] = ax1.axhline(y=0, color='green', linestyle='-', linewidth=2)
+        template["x_lsc"] = ax1.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["x_lic"] = ax1.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        ax1.set_xlabel('Número da Amostra', fontsize=12)
+        ax1.set_ylabel('X̄', fontsize=12)
+        ax1.grid(True, alpha=0.3)
+        template["r"], = ax2.plot([], [], 'ro-', linewidth=2, markersize=6, label='R')
+        template["r_lc"] = ax2.axhline(y=0, color='green', linestyle='-', linewidth=2)
+        template["r_lsc"] = ax2.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        template["r_lic"] = ax2.axhline(y=0, color='red', linestyle='--', linewidth=2)
+        ax2.set_ylabel('R', fontsize=12)
+        ax2.grid(True, alpha=0.3)
+        plt.subplots_adjust(hspace=0.4)
+        return template
+
+    def _y_ranges(self):
         x_bar_min = min(self.df['X_bar'].min(), self.lic_x_bar_graph)
         x_bar_max = max(self.df['X_bar'].max(), self.lsc_x_bar_graph)
         x_bar_margin = (x_bar_max - x_bar_min) * 0.1
         r_min = min(self.df['R'].min(), self.lic_r_bar_graph)
         r_max = max(self.df['R'].max(), self.lsc_r_bar_graph)
         r_margin = (r_max - r_min) * 0.1
-        ax1.plot(self.df['Amostra'], self.df['X_bar'], 'bo-', linewidth=2, markersize=6, label='X̄')
-        ax1.axhline(y=self.x_double_mean, color='green', linestyle='-', linewidth=2, label=f'LC = {self.x_double_mean:.4f}')
-        ax1.axhline(y=self.lsc_x_bar_graph, color='red', linestyle='--', linewidth=2, label=f'LSC = {self.lsc_x_bar_graph:.4f}')
-        ax1.axhline(y=self.lic_x_bar_graph, color='red', linestyle='--', linewidth=2, label=f'LIC = {self.lic_x_bar_graph:.4f}')
-        ax1.set_xlabel('Número da Amostra', fontsize=12)
-        ax1.set_ylabel('X̄', fontsize=12)
-        ax1.grid(True, alpha=0.3)
+        return (x_bar_min - x_bar_margin, x_bar_max + x_bar_margin), (max(0, r_min - r_margin), r_max + r_margin)
+
+    def _update_figure(self, template):
+        ax1, ax2 = template["ax1"], template["ax2"]
+        x_bar_range, r_range = self._y_ranges()
+        samples = chart_rendering.sample_positions(self.df['Amostra'])
+        template["x_bar"].set_data(samples, self.df['X_bar'])
+        for key, value, label in (
+            ("x_lc", self.x_double_mean, 'LC'),
+            ("x_lsc", self.lsc_x_bar_graph, 'LSC'),
+            ("x_lic", self.lic_x_bar_graph, 'LIC'),
+            ("r_lc", self.r_mean, 'LC'),
+            ("r_lsc", self.lsc_r_bar_graph, 'LSC'),
+            ("r_lic", self.lic_r_bar_graph, 'LIC'),
+        ):
+            template[key].set_ydata([value, value])
+            template[key].set_label(f'{label} = {value:.4f}')
         ax1.legend(loc='upper right', fontsize=10)
-        ax1.set_ylim(x_bar_min - x_bar_margin, x_bar_max + x_bar_margin)
-        ax2.plot(self.df['Amostra'], self.df['R'], 'ro-', linewidth=2, markersize=6, label='R')
-        ax2.axhline(y=self.r_mean, color='green', linestyle='-', linewidth=2, label=f'LC = {self.r_mean:.4f}')
-        ax2.axhline(y=self.lsc_r_bar_graph, color='red', linestyle='--', linewidth=2, label=f'LSC = {self.lsc_r_bar_graph:.4f}')
-        ax2.axhline(y=self.lic_r_bar_graph, color='red', linestyle='--', linewidth=2, label=f'LIC = {self.lic_r_bar_graph:.4f}')
-        ax2.set_ylabel('R', fontsize=12)
-        ax2.grid(True, alpha=0.3)
+        ax1.set_ylim(*x_bar_range)
+        chart_rendering.set_x_range(ax1, samples)
+        template["r"].set_data(samples, self.df['R'])
         ax2.legend(loc='upper right', fontsize=10)
-        ax2.set_ylim(max(0, r_min - r_margin), r_max + r_margin)
-        plt.subplots_adjust(hspace=0.4)
-        plt.tight_layout()
-        plt.savefig('grafico_controle_xr.png', dpi=300, bbox_inches='tight')
-        print("Gráfico salvo como 'grafico_controle_xr.png'")
-        plt.close(fig)
-
-    def analyze_control_status(self):
-        out_of_control_x = self.df[(self.df['X_bar'] > self.lsc_x_bar_graph) | (self.df['X_bar'] < self.lic_x_bar_graph)]
-        out_of_control_r = self.df[self.df['R'] > self.lsc_r_bar_graph]
-        total_out_of_control = len(out_of_control_x) + len(out_of_control_r)
-        print(f"Quantidade de termos fora dos limites de controle (X-barra): {len(out_of_control_x)}")
-        print(f"Quantidade de termos fora dos limites de controle (R): {len(out_of_control_r)}")
-        print(f"Total de termos fora dos limites de controle: {total_out_of_control}")
-        if self.lse is not None and self.lie is not None:
-            from process_capability import ProcessCapability
-            capability = ProcessCapability(
-                sigma=self.sigma,
-                lse=self.lse,
-                lie=self.lie
-            )
-            capability.set_process_mean(self.x_double_mean)
-            capability.calculate_all()
-            self.capability = capability
-        wer.analyze_xr_chart(self)
-        rg.generate_report_from_instance(self, chart_type="XR")
-
-    def set_default_specification_limits(self):
-        import pandas as pd
-        temp_df = pd.DataFrame(self.data)
-        temp_data_columns = temp_df["Dados"].apply(pd.Series)
-        temp_data_columns = temp_data_columns.rename(columns=lambda x: f'X{x+1}')
-        temp_complete_df = pd.concat([temp_df.drop(columns=["Dados"], axis=1), temp_data_columns], axis=1)
-        x_columns = [col for col in temp_complete_df.columns if col.startswith('X')]
-        temp_x_bar = temp_complete_df[x_columns].mean(axis=1).mean()
-        temp_std = temp_complete_df[x_columns].values.flatten().std()
-        self.lse = temp_x_bar + (3 * temp_std)
-        self.lie = temp_x_bar - (3 * temp_std)
-        print(f"📊 Limites de especificação padrão definidos:")
-        print(f"   LSE (Limite Superior): {self.lse:.4f}")
-        print(f"   LIE (Limite Inferior): {self.lie:.4f}")
-
-    def set_specification_limits(self, lse: float, lie: float):
-        self.lse = lse
-        self.lie = lie
-        print(f"[INFO] Limites de especificação definidos:")
-        print(f"   LSE (Limite Superior): {self.lse:.4f}")
-        print(f"   LIE (Limite Inferior): {self.lie:.4f}")
\ No newline at end of file
+        ax2.set_ylim(*r_range)
+        chart_rendering.set_x_range(ax2, samples)
+
+    def chart_spec(self):
+        x_bar_range, r_range = self._y_ranges()
+        samples = chart_rendering.sample_positions(self.df['Amostra'])
+        x_panel = svg_chart.panel(samples, xlabel='Número da Amostra', ylabel='X̄', ylim=x_bar_range)
+        svg_chart.add_series(x_panel, self.df['X_bar'], 'X̄', 'blue')
+        r_panel = svg_chart.panel(samples, ylabel='R', ylim=r_range)
+        svg_chart.add_series(r_panel, self.df['R'], 'R', 'red')
+        for target, lc, lsc, lic in (
+            (x_panel, self.x_double_mean, self.lsc_x_bar_graph, self.lic_x_bar_graph),
+            (r_panel, self.r_mean, self.lsc_r_bar_graph, self.lic_r_bar_graph),
+        ):
+            svg_chart.add_hline(target, lc, f'LC = {lc:.4f}', 'green')
+            svg_chart.add_hline(target, lsc, f'LSC = {lsc:.4f}', 'red', dash=True)
+            svg_chart.add_hline(target, lic, f'LIC = {lic:.4f}', 'red', dash=True)
+        return {"panels": [x_panel, r_panel]}
+
+    def _check_subgroups(self, rows):
+        width = self._base.shape[1]
+        if rows.ndim != 2 or rows.shape[1] > width or np.any(np.all(np.isnan(rows), axis=1)):
+            raise ValueError(f"Cada subgrupo deve ter de 1 a {width} medições.")
+        return _pad(rows, width)
+
+    def update_limits(self):
+        constants = self.constants
+        self.r_mean = self._r_sum / self._count
+        self.x_double_mean = self._x_bar_sum / self._count
+        self.sigma = self.r_mean / constants["d2"]
+        self.lsc_x_bar_graph = self.x_double_mean + (constants["A2"] * self.r_mean)
+        self.lic_x_bar_graph = self.x_double_mean - (constants["A2"] * self.r_mean)
+        self.lsc_r_bar_graph = self.r_mean * constants["D4"]
+        self.lic_r_bar_graph = self.r_mean * constants["D3"]
+        self.analysis = None
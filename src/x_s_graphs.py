@@ -0,0 +1,198 @@
+import AbstractCEP as AbstractCEP
+import numpy as np
+import matplotlib.pyplot as plt
+import chart_rendering
+import svg_chart
+
+
+class XS_graph(AbstractCEP.AbstractSubgroupChart):
+    # Gráficos X̄-S: sigma estimado pelos desvios-padrão dos subgrupos (σ̂ = média de s_i/c4(n_i)),
+    # mais eficiente que a amplitude para subgrupos grandes. Subgrupos de tamanhos diferentes
+    # (leituras ausentes como NaN) recebem limites por subgrupo:
+    #   X̄: X̄̄ ± 3σ̂/√n_i      S: c4(n_i)σ̂ com LSC = B4(n_i)·c4(n_i)σ̂ e LIC = B3(n_i)·c4(n_i)σ̂
+    # Com n constante equivale a X̄̄ ± A3·S̄, B4·S̄ e B3·S̄.
+    chart_type = "XS"
+    analyzer_names = ("analyzer_x", "analyzer_s")
+    sigma: float
+    s_mean: float
+    x_double_mean: float
+    lsc_x_bar_graph: float
+    lic_x_bar_graph: float
+    lsc_s_graph: float
+    lic_s_graph: float
+
+    def __init__(self, data_url="json_files/dados.json", constants_url="json_files/constantes_cep.json", streaming=False, compute_only=False, output_png='grafico_controle_xs.png', output_html='relatorio_cep_xs.html', render_profile=None, chart_format="png", table_mode="full"):
+        super().__init__(data_url, constants_url, streaming=streaming, compute_only=compute_only, output_png=output_png, output_html=output_html, render_profile=render_profile, chart_format=chart_format, table_mode=table_mode)
+
+    @property
+    def sample_sizes(self) -> np.ndarray:
+        return self._columns["n"][:self._count]
+
+    @property
+    def variable_n(self) -> bool:
+        return bool(np.count_nonzero(self._size_counts) > 1)
+
+    @property
+    def reference_n(self) -> int:
+        # Tamanho usado nos limites escalares (relatório); com n constante é o próprio n.
+        # Mediana lida do histograma de tamanhos, sem percorrer os subgrupos
+        cumulative = np.cumsum(self._size_counts)
+        lower = np.searchsorted(cumulative, (self._count - 1) // 2, side='right')
+        upper = np.searchsorted(cumulative, self._count // 2, side='right')
+        return int((lower + upper) / 2)
+
+    def normalize_data(self):
+        # Medições ficam só na matriz (subgrupos x n); o DataFrame guarda estatísticas por subgrupo
+        self._load_subgroups()
+        self.sigma = None
+        self._size_counts = np.zeros(0, dtype=np.int64)
+        self._s_c4_sum = self._weighted_sum = self._size_sum = 0.0
+        self.calculate_xbar_and_s()
+
+    def calculate_xbar_and_s(self):
+        self._store_statistics(self._subgroup_statistics(self._base))
+        print("Tabela X-S completa:")
+        print(self.df)
+        self.calculate_internal_metrics()
+
+    @staticmethod
+    def _subgroup_statistics(rows):
+        # n_i, X̄_i e s_i (ddof=1) vetorizados; NaN marca leituras ausentes
+        sizes = np.sum(~np.isnan(rows), axis=1)
+        if np.any(sizes < 2):
+            raise ValueError("Cada subgrupo deve ter pelo menos 2 medições para o gráfico X-S.")
+        return {"n": sizes, "X_bar": np.nanmean(rows, axis=1), "S": np.nanstd(rows, axis=1, ddof=1)}
+
+    def _store_statistics(self, statistics):
+        # Somas de s_i/c4(n_i), n_i·X̄_i e n_i e histograma de n alimentam update_limits
+        super()._store_statistics(statistics)
+        sizes = statistics["n"]
+        counts = np.bincount(sizes)
+        if len(counts) > len(self._size_counts):
+            self._size_counts = np.pad(self._size_counts, (0, len(counts) - len(self._size_counts)))
+        self._size_counts[:len(counts)] += counts
+        self._s_c4_sum += np.sum(statistics["S"] / self._constants_column("c4", sizes))
+        self._weighted_sum += np.sum(np.multiply(statistics["X_bar"], sizes, dtype=np.float64))
+        self._size_sum += np.sum(sizes, dtype=np.float64)
+
+    def _build_frame(self, frame):
+        # Limites por subgrupo, calculados só quando a tabela é lida
+        frame = super()._build_frame(frame)
+        if self.sigma is not None:
+            sizes = frame["n"].to_numpy()
+            c4 = self._constants_column("c4", sizes)
+            x_spread = 3 * self.sigma / np.sqrt(sizes)
+            frame["LSC_X"] = self.x_double_mean + x_spread
+            frame["LIC_X"] = self.x_double_mean - x_spread
+            frame["LC_S"] = c4 * self.sigma
+            frame["LSC_S"] = self._constants_column("B4", sizes) * c4 * self.sigma
+            frame["LIC_S"] = self._constants_column("B3", sizes) * c4 * self.sigma
+        return frame
+
+    def calculate_internal_metrics(self):
+        self.update_limits()
+        print(f"S_BAR: {self.s_mean}")
+        print(f"SIGMA: {self.sigma}")
+        print(f"X_DOUBLE_BAR: {self.x_double_mean}")
+        print(f"LIC (X_BAR): {self.lic_x_bar_graph}")
+        print(f"LC (X_BAR): {self.x_double_mean}")
+        print(f"LSC (X_BAR): {self.lsc_x_bar_graph}")
+        print(f"LIC (S): {self.lic_s_graph}")
+        print(f"LC (S): {self.s_mean}")
+        print(f"LSC (S): {self.lsc_s_graph}")
+        if not self.compute_only and self.chart_format == "png":
+            self.plot_control_charts()
+
+    def _constants_column(self, name, sizes):
+        # Uma consulta por tamanho distinto, espalhada para os subgrupos
+        unique, inverse = np.unique(sizes, return_inverse=True)
+        return np.array([self.constants_table[n][name] for n in unique])[inverse]
+
+    def update_limits(self):
+        self.sigma = float(self._s_c4_sum / self._count)
+        self.x_double_mean = float(self._weighted_sum / self._size_sum)
+        constants = self.constants_table[self.reference_n]
+        self.s_mean = constants["c4"] * self.sigma
+        self.lsc_x_bar_graph = self.x_double_mean + constants["A3"] * self.s_mean
+        self.lic_x_bar_graph = self.x_double_mean - constants["A3"] * self.s_mean
+        self.lsc_s_graph = constants["B4"] * self.s_mean
+        self.lic_s_graph = constants["B3"] * self.s_mean
+        self._df = None
+        self.analysis = None
+
+    @staticmethod
+    def _build_figure():
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
+        template = {"fig": fig, "ax1": ax1, "ax2": ax2}
+        template["x_bar"], = ax1.plot([], [], 'bo-', linewidth=2, markersize=6, label='X̄')
+        template["x_lc"], = ax1.plot([], [], color='green', linestyle='-', linewidth=2)
+        template["x_lsc"], = ax1.plot([], [], color='red', linestyle='--', linewidth=2, drawstyle='steps-mid')
+        template["x_lic"], = ax1.plot([], [], color='red', linestyle='--', linewidth=2, drawstyle='steps-mid')
+        ax1.set_xlabel('Número da Amostra', fontsize=12)
+        ax1.set_ylabel('X̄', fontsize=12)
+        ax1.grid(True, alpha=0.3)
+        template["s"], = ax2.plot([], [], 'ro-', linewidth=2, markersize=6, label='S')
+        template["s_lc"], = ax2.plot([], [], color='green', linestyle='-', linewidth=2, drawstyle='steps-mid')
+        template["s_lsc"], = ax2.plot([], [], color='red', linestyle='--', linewidth=2, drawstyle='steps-mid')
+        template["s_lic"], = ax2.plot([], [], color='red', linestyle='--', linewidth=2, drawstyle='steps-mid')
+        ax2.set_ylabel('S', fontsize=12)
+        ax2.grid(True, alpha=0.3)
+        plt.subplots_adjust(hspace=0.4)
+        return template
+
+    def _limit_lines(self):
+        # (chave do template, valores por subgrupo, rótulo); rótulo com valor só se o limite for constante
+        x_lc = np.full(len(self.df), self.x_double_mean)
+        lines = []
+        for key, values, label in (
+            ("x_lc", x_lc, 'LC'),
+            ("x_lsc", self.df['LSC_X'].to_numpy(), 'LSC'),
+            ("x_lic", self.df['LIC_X'].to_numpy(), 'LIC'),
+            ("s_lc", self.df['LC_S'].to_numpy(), 'LC'),
+            ("s_lsc", self.df['LSC_S'].to_numpy(), 'LSC'),
+            ("s_lic", self.df['LIC_S'].to_numpy(), 'LIC'),
+        ):
+            constant = len(values) > 0 and np.allclose(values, values[0])
+            lines.append((key, values, f'{label} = {values[0]:.4f}' if constant else f'{label} (n variável)'))
+        return lines
+
+    def _y_ranges(self):
+        x_bar_min = min(self.df['X_bar'].min(), self.df['LIC_X'].min())
+        x_bar_max = max(self.df['X_bar'].max(), self.df['LSC_X'].max())
+        x_bar_margin = (x_bar_max - x_bar_min) * 0.1
+        s_min = min(self.df['S'].min(), self.df['LIC_S'].min())
+        s_max = max(self.df['S'].max(), self.df['LSC_S'].max())
+        s_margin = (s_max - s_min) * 0.1
+        return (x_bar_min - x_bar_margin, x_bar_max + x_bar_margin), (max(0, s_min - s_margin), s_max + s_margin)
+
+    def _update_figure(self, template):
+        ax1, ax2 = template["ax1"], template["ax2"]
+        x_bar_range, s_range = self._y_ranges()
+        samples = chart_rendering.sample_positions(self.df['Amostra'])
+        template["x_bar"].set_data(samples, self.df['X_bar'])
+        template["s"].set_data(samples, self.df['S'])
+        for key, values, label in self._limit_lines():
+            template[key].set_data(samples, values)
+            template[key].set_label(label)
+        ax1.legend(loc='upper right', fontsize=10)
+        ax1.set_ylim(*x_bar_range)
+        chart_rendering.set_x_range(ax1, samples)
+        ax2.legend(loc='upper right', fontsize=10)
+        ax2.set_ylim(*s_range)
+        chart_rendering.set_x_range(ax2, samples)
+
+    def chart_spec(self):
+        x_bar_range, s_range = self._y_ranges()
+        samples = chart_rendering.sample_positions(self.df['Amostra'])
+        x_panel = svg_chart.panel(samples, xlabel='Número da Amostra', ylabel='X̄', ylim=x_bar_range)
+        svg_chart.add_series(x_panel, self.df['X_bar'], 'X̄', 'blue')
+        s_panel = svg_chart.panel(samples, ylabel='S', ylim=s_range)
+        svg_chart.add_series(s_panel, self.df['S'], 'S', 'red')
+        for key, values, label in self._limit_lines():
+            target = x_panel if key.startswith("x_") else s_panel
+            color = 'green' if key.endswith("_lc") else 'red'
+            if np.allclose(values, values[0]):
+                svg_chart.add_hline(target, values[0], label, color, dash=color == 'red')
+            else:
+                svg_chart.add_series(target, values, label, color, markers=False, dash=True)
+        return {"panels": [x_panel, s_panel]}
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import AbstractCEP as AbstractCEP
+import spc_constants
+
+
+@dataclass(frozen=True)
+class XRBatchResult:
+    # Arrays por característica (shape (C,)) e por subgrupo (shape (C, S))
+    x_bar: np.ndarray
+    r: np.ndarray
+    x_double_mean: np.ndarray
+    r_mean: np.ndarray
+    sigma: np.ndarray
+    lsc_x_bar_graph: np.ndarray
+    lic_x_bar_graph: np.ndarray
+    lsc_r_bar_graph: np.ndarray
+    lic_r_bar_graph: np.ndarray
+    out_of_control_x: np.ndarray
+    out_of_control_r: np.ndarray
+    sample_size: int
+
+    @property
+    def n_characteristics(self) -> int:
+        return self.x_bar.shape[0]
+
+    @property
+    def n_samples(self) -> int:
+        return self.x_bar.shape[1]
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "X_double_bar": self.x_double_mean,
+            "R_bar": self.r_mean,
+            "sigma": self.sigma,
+            "LSC_X": self.lsc_x_bar_graph,
+            "LIC_X": self.lic_x_bar_graph,
+            "LSC_R": self.lsc_r_bar_graph,
+            "LIC_R": self.lic_r_bar_graph,
+            "fora_X": self.out_of_control_x.sum(axis=1),
+            "fora_R": self.out_of_control_r.sum(axis=1)
+        })
+
+    def capability(self, lse, lie):
+        # lse/lie escalares ou arrays por característica (ver calculate_capability_batch)
+        from process_capability import calculate_capability_batch
+        return calculate_capability_batch(self.x_double_mean, self.sigma, lse, lie)
+
+
+def analyze_xr_batch(data, constants_table=None, constants_url="json_files/constantes_cep.json") -> XRBatchResult:
+    # data: array (características, subgrupos, n) — todas com o mesmo tamanho de subgrupo
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim != 3:
+        raise ValueError(f"Esperado array 3-D (características, subgrupos, n), recebido shape {data.shape}")
+    n_size = data.shape[2]
+    if constants_table is None:
+        constants_table = AbstractCEP.AbstractControlChart.json_to_data(constants_url)
+    constants = spc_constants.ConstantsProvider(constants_table)[n_size]
+
+    x_bar = data.mean(axis=2)
+    r = data.max(axis=2) - data.min(axis=2)
+    x_double_mean = x_bar.mean(axis=1)
+    r_mean = r.mean(axis=1)
+    sigma = r_mean / constants["d2"]
+    lsc_x = x_double_mean + constants["A2"] * r_mean
+    lic_x = x_double_mean - constants["A2"] * r_mean
+    lsc_r = r_mean * constants["D4"]
+    lic_r = r_mean * constants["D3"]
+
+    return XRBatchResult(
+        x_bar=x_bar,
+        r=r,
+        x_double_mean=x_double_mean,
+        r_mean=r_mean,
+        sigma=sigma,
+        lsc_x_bar_graph=lsc_x,
+        lic_x_bar_graph=lic_x,
+        lsc_r_bar_graph=lsc_r,
+        lic_r_bar_graph=lic_r,
+        out_of_control_x=(x_bar > lsc_x[:, None]) | (x_bar < lic_x[:, None]),
+        out_of_control_r=r > lsc_r[:, None],
+        sample_size=n_size
+    )
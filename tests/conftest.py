@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos ficam soltos em src/ e são importados pelo nome (ex.: "from CEP_Problems import ...")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from CEP_Problems import CEP_Problems
+
+
+POINTS = [
+    # (sigma_xbar, sigma, n, k_lim, N, minimo_aceitos)
+    (1, 1.5, 9, 3, 10, 8),
+    (1, 0, 4, 3, 5, 5),
+    (0.5, 0.75, 4, 2, 20, 15),
+    (2, -1, 1, 3, 1, 1),
+    (1, 3, 16, 2.5, 12, 0),
+]
+
+
+@pytest.mark.parametrize("point", POINTS)
+def test_grid_matches_scalar(point):
+    expected = CEP_Problems.cep_probabilidade(*point)
+    result = CEP_Problems.cep_probabilidade_grid(*point)
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_grid_broadcast_matches_scalar():
+    sigma_xbar, shift, n = np.array([1, 0.5]), np.array([0, 0.5, 1.5]), 9
+    p_aceitacao, p_aproveitar = CEP_Problems.cep_probabilidade_grid(sigma_xbar[:, None], shift[None, :], n, 3, 10, 8)
+    for i, j in np.ndindex(p_aceitacao.shape):
+        expected = CEP_Problems.cep_probabilidade(sigma_xbar[i], shift[j], n, 3, 10, 8)
+        np.testing.assert_allclose((p_aceitacao[i, j], p_aproveitar[i, j]), expected, rtol=1e-12)
+
+
+def test_curva_oc_uses_process_sigma():
+    # 0,5σ do processo com n = 9 é 1,5σ de X̄: mesmo ponto do escalar
+    curva = CEP_Problems.curva_oc([0.5], [9], k_lim=3, N=10, minimo_aceitos=8)
+    expected = CEP_Problems.cep_probabilidade(1, 1.5, 9, 3, 10, 8)
+    np.testing.assert_allclose((curva["p_aceitacao"][0, 0], curva["p_aproveitar"][0, 0]), expected, rtol=1e-12)